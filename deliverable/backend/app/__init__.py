@@ -1,16 +1,31 @@
 """Main Flask application module."""
 from flask import Flask, jsonify
+from flask_compress import Compress
 from flask_cors import CORS
 import threading
 from loguru import logger
 
 from app.config import configs
+from app.json_encoder import OrjsonEncoder
+from app.shutdown import install_signal_handlers
 from app.api.v1 import api_v1_bp
 
 def create_app(config_name="default"):
     """Create and configure the Flask application."""
     app = Flask(__name__)
+    app.json_encoder = OrjsonEncoder
+    install_signal_handlers()
     
+    # Compress JSON responses. Streamed responses (SSE, the NDJSON file
+    # contents, raw files from send_file) are left out on purpose:
+    # flask-compress reads the whole body with get_data(), which would buffer
+    # the stream. COMPRESS_STREAMS covers raw .json files, which the mimetype
+    # list alone would let through.
+    app.config["COMPRESS_MIMETYPES"] = ["application/json"]
+    app.config["COMPRESS_MIN_SIZE"] = 512
+    app.config["COMPRESS_STREAMS"] = False
+    Compress(app)
+
     # Configure CORS
     CORS(app, resources={r"/*": {"origins": configs.CORS_ORIGINS}})
     
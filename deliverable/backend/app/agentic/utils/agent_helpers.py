@@ -1,17 +1,47 @@
 """Helper functions for agent-related operations."""
 
+import asyncio
+import threading
+import weakref
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 from uuid import UUID
 
 from app.agentic.agents.coder.agent import CoderAgent
 from app.config import configs
 from app.agentic.storage.list_store import FileListStore
 
+# Maximum number of agents kept alive between requests
+_AGENT_CACHE_SIZE = 256
+
+_agents: "OrderedDict[Tuple[str, Optional[UUID]], CoderAgent]" = OrderedDict()
+_agents_lock = threading.Lock()
+
+# One run at a time per project; see agent_run_lock. A lock lives as long as
+# a run holds or waits on it.
+_run_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def _create_agent(project_id: str, user_id: Optional[UUID]) -> CoderAgent:
+    project_root = Path(configs.WORKSPACE_PATH) / project_id
+    memory_store = FileListStore(str(project_root / ".lovable" / "memory.dat"))
+
+    return CoderAgent(
+        memory=memory_store,
+        cwd=str(project_root),
+        user_id=user_id,
+    )
+
 
 def get_agent(project_id: str, user_id: Optional[UUID] = None) -> CoderAgent:
     """Get a CoderAgent instance for the specified project.
 
+    Agents are cached per project and user, so repeated requests reuse the
+    same instance instead of rebuilding its clients and managers. A cached
+    agent keeps per-run state (task state, messages, tool executor), so
+    every run must hold the project's agent_run_lock.
+
     Args:
         project_id: The project ID
         user_id: Optional UUID of the current user for credit tracking
@@ -19,12 +49,58 @@ def get_agent(project_id: str, user_id: Optional[UUID] = None) -> CoderAgent:
     Returns:
         A CoderAgent instance
     """
-    project_root = Path(configs.WORKSPACE_PATH) / project_id
-    memory_store = FileListStore(str(project_root / ".lovable" / "memory.dat"))
+    key = (project_id, user_id)
+    with _agents_lock:
+        agent = _agents.get(key)
+        if agent is not None:
+            _agents.move_to_end(key)
+            return agent
 
-    # Create a new agent for this project
-    return CoderAgent(
-        memory=memory_store,
-        cwd=str(project_root),
-        user_id=user_id,
-    )
+    # Build outside the lock; if another thread won the race, keep its agent
+    agent = _create_agent(project_id, user_id)
+    with _agents_lock:
+        agent = _agents.setdefault(key, agent)
+        _agents.move_to_end(key)
+        while len(_agents) > _AGENT_CACHE_SIZE:
+            _agents.popitem(last=False)
+    return agent
+
+
+def forget_agent(project_id: str) -> None:
+    """Drop cached agents for a project.
+
+    Call this when the project's files or memory change underneath the
+    agent, e.g. after it is deleted or switched to another commit.
+
+    Args:
+        project_id: The project ID
+    """
+    with _agents_lock:
+        for key in [key for key in _agents if key[0] == project_id]:
+            del _agents[key]
+
+
+def agent_run_lock(project_id: str) -> asyncio.Lock:
+    """Get the lock that serializes agent runs in a project.
+
+    ``agent.run()`` resets and mutates state shared across the cached
+    instance, and every agent of a project edits the same working tree, so
+    two overlapping runs (e.g. a new /chat message while the previous one
+    is still streaming, or /chat-sync) would interleave at every await.
+    Holding this lock for the whole run queues them instead. The lock is
+    keyed by project rather than by agent, so a run started after
+    forget_agent dropped the instance still waits for the old one. Runs for
+    a project all execute on the same background loop, which the lock binds
+    to on first use.
+
+    Args:
+        project_id: The project the agent runs in
+
+    Returns:
+        The project's run lock
+    """
+    with _agents_lock:
+        lock = _run_locks.get(project_id)
+        if lock is None:
+            lock = _run_locks[project_id] = asyncio.Lock()
+        return lock
@@ -1,4 +1,6 @@
+import functools
 import os
+import re
 import time
 from collections import deque
 from concurrent.futures import TimeoutError
@@ -6,27 +8,11 @@ from pathlib import Path
 
 import pathspec
 
-# Create a PathSpec for directories to ignore
-DIRS_TO_IGNORE_SPEC = pathspec.PathSpec.from_lines(
-    "gitwildmatch",
-    [
-        "node_modules/**",
-        "__pycache__/**",
-        "env/**",
-        "venv/**",
-        "target/dependency/**",
-        "build/dependencies/**",
-        "dist/**",
-        "out/**",
-        "bundle/**",
-        "vendor/**",
-        "tmp/**",
-        "temp/**",
-        "deps/**",
-        "pkg/**",
-        "Pods/**",
-        ".*/**",
-    ],
+# Directories to ignore, each matched as a root-anchored "<dir>/**"
+# gitwildmatch pattern; a single alternation checks them all in one pass
+_DIRS_TO_IGNORE_RE = re.compile(
+    r"^(?:node_modules|__pycache__|env|venv|target/dependency|build/dependencies"
+    r"|dist|out|bundle|vendor|tmp|temp|deps|pkg|Pods|\.[^/]*)/"
 )
 
 
@@ -35,13 +21,25 @@ def are_paths_equal(path1: str, path2: str) -> bool:
     return os.path.normpath(path1) == os.path.normpath(path2)
 
 
+@functools.lru_cache(maxsize=128)
+def _load_gitignore_spec(
+    gitignore_path: str, mtime_ns: int, size: int
+) -> pathspec.PathSpec:
+    """Parse a .gitignore file, cached per (path, mtime, size) so edits invalidate it."""
+    with open(gitignore_path, "r") as f:
+        return pathspec.PathSpec.from_lines("gitwildmatch", f.readlines())
+
+
 def get_gitignore_spec(dir_path: str) -> pathspec.PathSpec | None:
     """Create a PathSpec from .gitignore if it exists."""
-    gitignore_path = os.path.join(dir_path, ".gitignore")
+    gitignore_path = os.path.join(os.path.abspath(dir_path), ".gitignore")
     try:
-        if os.path.exists(gitignore_path):
-            with open(gitignore_path, "r") as f:
-                return pathspec.PathSpec.from_lines("gitwildmatch", f.readlines())
+        st = os.stat(gitignore_path)
+    except OSError:
+        return None
+
+    try:
+        return _load_gitignore_spec(gitignore_path, st.st_mtime_ns, st.st_size)
     except Exception as e:
         print(f"Error reading .gitignore: {e}")
     return None
@@ -92,17 +90,15 @@ async def list_files(
 def list_files_single_level(dir_path: str, limit: int) -> tuple[list[str], bool]:
     """List files in a single directory level."""
     try:
-        base_path = Path(dir_path)
         paths = []
 
         with os.scandir(dir_path) as entries:
             for entry in entries:
-                path = Path(entry.path)
-                relative_path = str(path.relative_to(base_path))
+                # Entries of a single level are relative by their name alone
                 if entry.is_dir():
-                    paths.append(f"{relative_path}/")
+                    paths.append(f"{entry.name}/")
                 else:
-                    paths.append(relative_path)
+                    paths.append(entry.name)
 
         reached_limit = len(paths) >= limit
         return paths[:limit], reached_limit
@@ -113,9 +109,9 @@ def list_files_single_level(dir_path: str, limit: int) -> tuple[list[str], bool]
 
 def should_ignore(path: str, gitignore_spec: pathspec.PathSpec | None) -> bool:
     """Check if a path should be ignored based on gitignore patterns."""
-    if gitignore_spec and gitignore_spec.match_file(path):
+    if _DIRS_TO_IGNORE_RE.match(path):
         return True
-    return DIRS_TO_IGNORE_SPEC.match_file(path)
+    return bool(gitignore_spec and gitignore_spec.match_file(path))
 
 
 async def list_files_recursive(
@@ -124,11 +120,11 @@ async def list_files_recursive(
     """
     List files recursively using breadth-first traversal with timeout and gitignore support.
     """
-    base_path = Path(dir_path)
     start_time = time.time()
     TIMEOUT = 10  # seconds
     results: list[str] = []
-    queue = deque([(base_path, "")])  # (full_path, relative_path)
+    seen: set[str] = set()  # O(1) membership checks alongside results
+    queue = deque([(dir_path, "")])  # (full_path, relative_path)
 
     while queue and len(results) < limit:
         if time.time() - start_time > TIMEOUT:
@@ -147,28 +143,29 @@ async def list_files_recursive(
                 dirs = []
                 files = []
 
-                # Check if directory should be included in results
-                if current_path != base_path:
+                # Ignored directories are pruned before being queued, so any
+                # dequeued directory belongs in the results without re-matching
+                if rel_path:
                     dir_path = rel_path + "/"
-                    if not should_ignore(dir_path, gitignore_spec):
-                        if len(results) < limit and dir_path not in results:
-                            results.append(dir_path)
+                    if len(results) < limit and dir_path not in seen:
+                        seen.add(dir_path)
+                        results.append(dir_path)
 
                 # Process entries at current directory level
                 for entry in entries:
-                    path = Path(entry.path)
-                    relative_path = str(path.relative_to(base_path))
-
-                    # Format path for gitignore pattern matching
-                    check_path = (
-                        relative_path + "/" if entry.is_dir() else relative_path
+                    # Extend the parent's relative path instead of re-deriving
+                    # it from the absolute path for every entry
+                    relative_path = (
+                        f"{rel_path}/{entry.name}" if rel_path else entry.name
                     )
-                    if should_ignore(check_path, gitignore_spec):
-                        continue
 
                     if entry.is_dir():
-                        dirs.append((path, relative_path))
-                    else:
+                        # Prune ignored directories here so their subtree is
+                        # never scanned or matched entry by entry
+                        if should_ignore(relative_path + "/", gitignore_spec):
+                            continue
+                        dirs.append((entry.path, relative_path))
+                    elif not should_ignore(relative_path, gitignore_spec):
                         files.append(relative_path)
 
                 # Ensure consistent ordering in results
@@ -179,7 +176,8 @@ async def list_files_recursive(
                 for file_path in files:
                     if len(results) >= limit:
                         break
-                    if file_path not in results:
+                    if file_path not in seen:
+                        seen.add(file_path)
                         results.append(file_path)
 
                 # Add subdirectories to processing queue
@@ -189,4 +187,6 @@ async def list_files_recursive(
                 print(f"Error processing {current_path}: {e}")
                 continue
 
-    return sorted(results[:limit]), len(results) >= limit
+    # BFS with per-level sorting already yields a stable order; callers such as
+    # format_files_list apply their own presentation sort
+    return results[:limit], len(results) >= limit
@@ -1,6 +1,37 @@
 """Utilities for reading file contents with optional line number formatting."""
 
+import io
 from pathlib import Path
+from typing import Optional, Union
+
+# Number of leading bytes inspected to decide whether a file is binary
+BINARY_SNIFF_SIZE = 4096
+
+
+def open_text_file(file_path: Union[str, Path]) -> Optional[io.TextIOWrapper]:
+    """
+    Open a file for UTF-8 text reading unless it looks binary.
+
+    A NUL byte in the first BINARY_SNIFF_SIZE bytes marks the file as binary,
+    the same heuristic grep uses, so binary blobs are rejected without
+    decoding them in full.
+
+    Args:
+        file_path: Path to the file to open
+
+    Returns:
+        A text stream positioned at the start of the file, or None if binary
+    """
+    fb = open(file_path, "rb")
+    try:
+        if b"\0" in fb.read(BINARY_SNIFF_SIZE):
+            fb.close()
+            return None
+        fb.seek(0)
+        return io.TextIOWrapper(fb, encoding="utf-8")
+    except Exception:
+        fb.close()
+        raise
 
 
 def read_file_content(file_path: str, add_line_numbers: bool = True) -> str:
@@ -15,21 +46,19 @@ def read_file_content(file_path: str, add_line_numbers: bool = True) -> str:
         File contents as a string, optionally with line numbers
     """
     try:
-        path = Path(file_path)
-        if not path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
-
-        with open(path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-
-        if add_line_numbers:
-            # Add line numbers to content
-            numbered_lines = [f"{i+1} | {line}" for i, line in enumerate(lines)]
-            return "".join(numbered_lines)
-        else:
+        f = open_text_file(file_path)
+        if f is None:
+            return f"Error: File {file_path} appears to be a binary file"
+
+        with f:
+            if add_line_numbers:
+                # Number lines straight off the file iterator
+                return "".join(f"{i} | {line}" for i, line in enumerate(f, 1))
             # Return raw content without line numbers
-            return "".join(lines)
+            return f.read()
 
+    except FileNotFoundError:
+        return f"Error reading file {file_path}: File not found: {file_path}"
     except UnicodeDecodeError:
         return f"Error: File {file_path} appears to be a binary file"
     except Exception as e:
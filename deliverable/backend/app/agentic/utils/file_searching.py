@@ -1,9 +1,14 @@
 """Module for searching text patterns in files with context."""
 
+import fnmatch
 import os
 import re
+from bisect import bisect_right
+from itertools import accumulate
 from pathlib import Path
-from typing import Optional, TypedDict, Union
+from typing import Iterator, Optional, TextIO, TypedDict, Union
+
+from app.agentic.utils.file_reading import open_text_file
 
 
 class MatchContext(TypedDict):
@@ -15,6 +20,113 @@ class MatchContext(TypedDict):
     after: str
 
 
+# Files up to this size are searched as a single buffer
+WHOLE_FILE_SEARCH_LIMIT = 1024 * 1024
+
+# Constructs that can behave differently on a whole buffer than on a single
+# line: \A, \Z and \z anchors, and lookarounds that can see past the line.
+# Patterns containing them are always searched line by line.
+_LINE_SENSITIVE = re.compile(r"\\[AZz]|\(\?<?[=!]")
+
+
+def _search_lines(
+    f: TextIO, pattern: re.Pattern[str], limit: int
+) -> list[MatchContext]:
+    """Search a text stream line by line, keeping only a 3-line window in memory."""
+    file_matches: list[MatchContext] = []
+    before_ctx = ""
+    line = next(f, None)
+    line_num = 1
+    while line is not None:
+        after_ctx = next(f, None)
+        if pattern.search(line):
+            file_matches.append(
+                {
+                    "line_num": line_num,
+                    "before": before_ctx.rstrip(),
+                    "match": line.rstrip(),
+                    "after": (after_ctx or "").rstrip(),
+                }
+            )
+
+            if len(file_matches) >= limit:
+                break
+
+        before_ctx = line
+        line = after_ctx
+        line_num += 1
+
+    return file_matches
+
+
+def _search_text(
+    text: str, pattern: re.Pattern[str], text_pattern: re.Pattern[str], limit: int
+) -> list[MatchContext]:
+    """Search a whole file buffer, entering the regex engine once per hit.
+
+    text_pattern scans the buffer for the next candidate line, which is then
+    confirmed with the per-line pattern. The scan resumes at the following
+    line, so a match spilling over a newline cannot hide matches on the
+    lines it covers. Results match _search_lines only for patterns without
+    line-sensitive constructs; see _LINE_SENSITIVE.
+    """
+    if not text:
+        return []
+
+    lines = text.split("\n")
+    if text.endswith("\n"):
+        lines.pop()
+    line_starts = list(accumulate((len(line) + 1 for line in lines[:-1]), initial=0))
+
+    file_matches: list[MatchContext] = []
+    pos = 0
+    while len(file_matches) < limit:
+        match = text_pattern.search(text, pos)
+        if match is None:
+            break
+
+        idx = bisect_right(line_starts, match.start()) - 1
+        line = lines[idx]
+        # Per-line matching sees the line with its newline, as file iteration does
+        has_newline = idx < len(lines) - 1 or text.endswith("\n")
+        if pattern.search(line + "\n" if has_newline else line):
+            file_matches.append(
+                {
+                    "line_num": idx + 1,
+                    "before": lines[idx - 1].rstrip() if idx > 0 else "",
+                    "match": line.rstrip(),
+                    "after": lines[idx + 1].rstrip() if idx + 1 < len(lines) else "",
+                }
+            )
+
+        if idx + 1 >= len(lines):
+            break
+        pos = line_starts[idx + 1]
+
+    return file_matches
+
+
+def _walk_files(dir_path: str, rel_dir: str = "") -> Iterator[tuple[str, str, str]]:
+    """Yield (absolute path, relative path, file name) for every file below dir_path.
+
+    Recurses with os.scandir so entry types come from the directory listing
+    instead of an extra stat per entry. Unreadable directories are skipped,
+    matching os.walk's default behaviour.
+    """
+    try:
+        with os.scandir(dir_path) as it:
+            entries = list(it)
+    except OSError:
+        return
+
+    for entry in entries:
+        rel_path = os.path.join(rel_dir, entry.name)
+        if entry.is_dir(follow_symlinks=False):
+            yield from _walk_files(entry.path, rel_path)
+        elif entry.is_file():
+            yield entry.path, rel_path, entry.name
+
+
 async def search_files(
     base_path: Union[str, Path],
     regex: str,
@@ -37,59 +149,49 @@ async def search_files(
         raise FileNotFoundError(f"Path not found: {path}")
 
     pattern = re.compile(regex)
+    # Same pattern applied to a whole buffer; MULTILINE keeps ^ and $ per line.
+    # Anchors and lookarounds could find different lines there, so such
+    # patterns skip the buffer scan.
+    text_pattern = (
+        None if _LINE_SENSITIVE.search(regex) else re.compile(regex, re.MULTILINE)
+    )
     matches: dict[str, list[MatchContext]] = {}
     total_matches = 0
 
-    def glob_to_regex(glob_pattern: str) -> str:
-        """Convert glob pattern to regex pattern."""
-        # Escape all special regex characters first
-        pattern = re.escape(glob_pattern)
-        # Convert glob * to regex .*
-        pattern = pattern.replace("\\*", ".*")
-        # Convert glob ? to regex .
-        pattern = pattern.replace("\\?", ".")
-        # Ensure pattern matches entire string
-        return f"^{pattern}$"
-
-    file_regex = re.compile(glob_to_regex(file_pattern)) if file_pattern else None
+    # fnmatch.translate handles character classes and anchors the pattern;
+    # matching stays case-sensitive like the shell glob it mirrors
+    file_regex = re.compile(fnmatch.translate(file_pattern)) if file_pattern else None
 
-    for root, _, files in os.walk(path):
+    for file_path, rel_path, file in _walk_files(str(path)):
         if total_matches >= max_results:
             break
 
-        for file in files:
-            if file_regex and not file_regex.match(file):
-                continue
-
-            try:
-                file_path = Path(root) / file
-                rel_path = file_path.relative_to(base_path)
-
-                with open(file_path, "r", encoding="utf-8") as f:
-                    lines = f.readlines()
-                    for i, line in enumerate(lines):
-                        if pattern.search(line):
-                            # Get context lines (1 line before and after)
-                            before_ctx = lines[i - 1] if i > 0 else ""
-                            after_ctx = lines[i + 1] if i < len(lines) - 1 else ""
-
-                            if str(rel_path) not in matches:
-                                matches[str(rel_path)] = []
-
-                            matches[str(rel_path)].append(
-                                {
-                                    "line_num": i + 1,
-                                    "before": before_ctx.rstrip(),
-                                    "match": line.rstrip(),
-                                    "after": after_ctx.rstrip(),
-                                }
-                            )
-                            total_matches += 1
-
-                            if total_matches >= max_results:
-                                break
-            except (UnicodeDecodeError, IOError):
-                continue  # Skip binary or unreadable files
+        if file_regex and not file_regex.match(file):
+            continue
+
+        try:
+            f = open_text_file(file_path)
+            if f is None:
+                continue  # Skip binary files without decoding them
+
+            remaining = max_results - total_matches
+            with f:
+                if (
+                    text_pattern is not None
+                    and os.fstat(f.fileno()).st_size <= WHOLE_FILE_SEARCH_LIMIT
+                ):
+                    file_matches = _search_text(
+                        f.read(), pattern, text_pattern, remaining
+                    )
+                else:
+                    file_matches = _search_lines(f, pattern, remaining)
+
+            # Only record matches once the whole file decoded cleanly
+            if file_matches:
+                matches[rel_path] = file_matches
+                total_matches += len(file_matches)
+        except (UnicodeDecodeError, IOError):
+            continue  # Skip binary or unreadable files
 
     return matches, total_matches
 
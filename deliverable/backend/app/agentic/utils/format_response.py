@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass
 from typing import Optional
 
@@ -94,6 +95,19 @@ def tool_result(text: str, images: Optional[list[str]] = None) -> ToolResponse:
     return ToolResponse.create_text_message(text)
 
 
+def _path_sort_key(path: str) -> tuple[tuple[bool, str], ...]:
+    """Sort key listing directories before files at every level.
+
+    Each component maps to (is_file_at_this_level, lowercased_name); the path
+    is split only once per entry.
+    """
+    components = path.split("/")
+    last = len(components) - 1
+    return tuple(
+        (i == last, component.lower()) for i, component in enumerate(components)
+    )
+
+
 def format_files_list(base_path: str, files: list[str], hit_limit: bool = False) -> str:
     """Format directory listing with optional truncation notice.
 
@@ -108,29 +122,18 @@ def format_files_list(base_path: str, files: list[str], hit_limit: bool = False)
     if not files or (len(files) == 1 and not files[0]):
         return "No files found."
 
-    # Convert absolute paths to relative and ensure forward slashes
+    # Convert absolute paths to relative in a single pass
+    prefix_len = len(base_path)
     relative_paths = [
-        path.replace("\\", "/")  # Convert Windows backslashes if any
-        for path in [
-            path[len(base_path) :].lstrip("/") if path.startswith(base_path) else path
-            for path in files
-        ]
+        path[prefix_len:].lstrip("/") if path.startswith(base_path) else path
+        for path in files
     ]
+    if os.sep != "/":
+        # Convert Windows backslashes to forward slashes
+        relative_paths = [path.replace("\\", "/") for path in relative_paths]
 
     # Sort files so directories are listed before their contents
-    sorted_paths = sorted(
-        relative_paths,
-        key=lambda p: (
-            # Split path into components
-            tuple(
-                # For each component, create a tuple of:
-                # (is_file_at_this_level, normalized_component_name)
-                # is_file_at_this_level helps sort directories before files
-                (i + 1 == len(p.split("/")), component.lower())
-                for i, component in enumerate(p.split("/"))
-            )
-        ),
-    )
+    sorted_paths = sorted(relative_paths, key=_path_sort_key)
 
     file_list = "\n".join(sorted_paths)
 
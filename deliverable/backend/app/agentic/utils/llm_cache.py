@@ -0,0 +1,107 @@
+"""In-process caching for LLM-backed generators."""
+
+import asyncio
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Generic, Tuple, TypeVar, Union
+
+T = TypeVar("T")
+
+
+class Uncached(Generic[T]):
+    """A result that llm_cache returns to the caller without caching it.
+
+    Wrap fallback values, e.g. when the LLM response could not be parsed,
+    so a transient failure is not replayed for the whole TTL.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: T) -> None:
+        self.value = value
+
+
+def _digest(text: str) -> str:
+    """Hash an input string into a compact cache key."""
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def llm_cache(
+    maxsize: int = 1024, ttl: float = 3600.0
+) -> Callable[
+    [Callable[[str], Awaitable[Union[T, Uncached[T]]]]], Callable[[str], Awaitable[T]]
+]:
+    """Memoize an async function of a single string argument.
+
+    Results are kept in an LRU keyed on a hash of the input and expire after
+    ``ttl`` seconds. Concurrent calls with the same input on the same event
+    loop share one in-flight call. Exceptions and results wrapped in
+    ``Uncached`` are never cached.
+
+    Args:
+        maxsize: Maximum number of cached results
+        ttl: Seconds a cached result stays valid
+
+    Returns:
+        Decorator wrapping the async function
+    """
+
+    def decorator(
+        func: Callable[[str], Awaitable[Union[T, Uncached[T]]]],
+    ) -> Callable[[str], Awaitable[T]]:
+        cache: "OrderedDict[str, Tuple[float, T]]" = OrderedDict()
+        in_flight: Dict[Tuple[int, str], "asyncio.Task[Union[T, Uncached[T]]]"] = {}
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        async def wrapper(text: str) -> T:
+            key = _digest(text)
+            loop = asyncio.get_running_loop()
+            flight_key = (id(loop), key)
+
+            with lock:
+                entry = cache.get(key)
+                if entry is not None:
+                    if entry[0] > time.monotonic():
+                        cache.move_to_end(key)
+                        return entry[1]
+                    del cache[key]
+
+                task = in_flight.get(flight_key)
+                if task is None:
+                    task = loop.create_task(func(text))
+                    in_flight[flight_key] = task
+                    owner = True
+                else:
+                    owner = False
+
+            try:
+                result = await asyncio.shield(task)
+            finally:
+                if owner:
+                    with lock:
+                        in_flight.pop(flight_key, None)
+
+            if isinstance(result, Uncached):
+                return result.value
+
+            if owner:
+                with lock:
+                    cache[key] = (time.monotonic() + ttl, result)
+                    cache.move_to_end(key)
+                    while len(cache) > maxsize:
+                        cache.popitem(last=False)
+
+            return result
+
+        def cache_clear() -> None:
+            with lock:
+                cache.clear()
+
+        wrapper.cache_clear = cache_clear  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
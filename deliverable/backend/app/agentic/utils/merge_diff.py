@@ -1,14 +1,152 @@
-from typing import List, cast
+import re
+from typing import List, Optional, cast
 
 from litellm import Choices, acompletion
 from litellm.types.utils import ModelResponse
 
 from app.config import configs
 
+# Unified diff hunk header, e.g. "@@ -12,5 +12,7 @@"
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,\d+)? \+\d+(?:,\d+)? @@")
+
+# Lines with their "\n" terminators. Unlike str.splitlines, form feeds and
+# other Unicode line boundaries stay inside a line.
+_LINE = re.compile(r"[^\n]*\n|[^\n]+")
+
+Hunk = tuple[int, list[str], list[str]]
+
+
+def _split_lines(text: str) -> list[str]:
+    """Split text on "\n" only, keeping each line's terminator."""
+    return _LINE.findall(text)
+
+
+def _strip_eol(line: str) -> str:
+    """Drop a line's "\n" or "\r\n" terminator."""
+    if line.endswith("\n"):
+        line = line[:-1]
+        if line.endswith("\r"):
+            line = line[:-1]
+    return line
+
+
+def _parse_hunks(diff_content: str) -> Optional[list[Hunk]]:
+    """Parse unified diff hunks into (old_start, old_lines, new_lines).
+
+    Hunk lines are returned without terminators. Returns None when the diff
+    contains no hunks or a line that is not valid inside a hunk, so the
+    caller can fall back to the LLM merge.
+    """
+    hunks: list[Hunk] = []
+    current: Optional[Hunk] = None
+
+    for line in map(_strip_eol, _split_lines(diff_content)):
+        header = _HUNK_HEADER.match(line)
+        if header:
+            current = (int(header.group(1)), [], [])
+            hunks.append(current)
+            continue
+
+        if current is None:
+            # Skip "---"/"+++" file headers and any preamble
+            continue
+
+        _, old_lines, new_lines = current
+        if line.startswith("\\"):
+            # "\ No newline at end of file"
+            continue
+        if line == "" or line.startswith(" "):
+            old_lines.append(line[1:])
+            new_lines.append(line[1:])
+        elif line.startswith("-"):
+            old_lines.append(line[1:])
+        elif line.startswith("+"):
+            new_lines.append(line[1:])
+        else:
+            return None
+
+    return hunks or None
+
+
+def _find_block(
+    lines: list[str], block: list[str], expected: int, start: int
+) -> Optional[int]:
+    """Locate block in lines at or after start, nearest to the expected index.
+
+    The search widens outward from expected one line at a time. If matches
+    are found at the same distance on both sides, the hunk is ambiguous and
+    None is returned, so the LLM merge decides instead of patching a guess.
+    """
+    size = len(block)
+    last = len(lines) - size
+    expected = min(max(expected, start), max(last, start))
+    for distance in range(max(expected - start, last - expected) + 1):
+        found = [
+            idx
+            for idx in {expected - distance, expected + distance}
+            if start <= idx <= last and lines[idx : idx + size] == block
+        ]
+        if len(found) == 1:
+            return found[0]
+        if found:
+            return None
+    return None
+
+
+def apply_unified_diff(original_code: str, diff_content: str) -> Optional[str]:
+    """Apply a unified diff deterministically.
+
+    Hunks are matched on their context and removed lines, starting at the
+    line number from the hunk header (shifted by the previous hunk's
+    offset) and searching outward if the file has moved. Line endings are
+    preserved; added lines use the file's dominant ending.
+
+    Args:
+        original_code: The original source code
+        diff_content: The diff content to apply
+
+    Returns:
+        The patched code, or None if the diff is not a unified diff or any
+        hunk does not apply cleanly or unambiguously
+    """
+    hunks = _parse_hunks(diff_content)
+    if hunks is None:
+        return None
+
+    lines = _split_lines(original_code)
+    keys = [_strip_eol(line) for line in lines]
+    eol = "\r\n" if original_code.count("\r\n") * 2 > original_code.count("\n") else "\n"
+    merged: list[str] = []
+    pos = 0
+    offset = 0
+
+    for old_start, old_lines, new_lines in hunks:
+        if not old_lines and lines:
+            # Without context lines there is nothing to anchor the hunk on
+            return None
+        expected = max(old_start - 1, 0) + offset
+        idx = _find_block(keys, old_lines, expected, pos)
+        if idx is None:
+            return None
+        offset = idx - max(old_start - 1, 0)
+        merged.extend(lines[pos:idx])
+        merged.extend(line + eol for line in new_lines)
+        pos = idx + len(old_lines)
+
+    merged.extend(lines[pos:])
+    result = "".join(merged)
+    if not original_code.endswith("\n") and result.endswith("\n"):
+        # Keep a missing final newline missing
+        result = result[: -len(eol)] if result.endswith(eol) else result[:-1]
+    return result
+
 
 async def merge_diff(original_code: str, diff_content: str) -> tuple[str, bool]:
     """
-    Merge original code with a diff using GPT-4-mini via litellm.
+    Merge original code with a diff.
+
+    Well-formed unified diffs are applied locally; the LLM merge via litellm
+    is only used when a hunk no longer matches the original code.
 
     Args:
         original_code: The original source code
@@ -17,6 +155,10 @@ async def merge_diff(original_code: str, diff_content: str) -> tuple[str, bool]:
     Returns:
         Tuple of (merged code, success boolean)
     """
+    patched_code = apply_unified_diff(original_code, diff_content)
+    if patched_code is not None:
+        return patched_code, True
+
     try:
         prompt = f"""You are a code merging assistant. Merge the following diff content into the original code:
 
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import mmap
 from base64 import b64encode
 from dataclasses import dataclass
 from datetime import datetime
@@ -75,6 +76,40 @@ def create_image_block(image_url: str) -> ImageBlock:
     return {"type": "image_url", "image_url": {"url": image_url}}
 
 
+def _sniff_mime(head: bytes) -> str:
+    """Guess a MIME type from the leading magic bytes of a file."""
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head.startswith(b"%PDF"):
+        return "application/pdf"
+    # Historical default for attachments
+    return "image/jpeg"
+
+
+def _file_to_data_uri(path: str, mime_type: Optional[str] = None) -> str:
+    """Build a base64 data URI for a file without copying it into a bytes object.
+
+    The file is memory-mapped so only the encoded output is allocated. When
+    mime_type is not given it is sniffed from the file's magic bytes.
+    """
+    with open(path, "rb") as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                mime = mime_type or _sniff_mime(mm[:12])
+                return f"data:{mime};base64,{b64encode(mm).decode('ascii')}"
+        except ValueError:
+            # Empty files cannot be mapped
+            data = f.read()
+            mime = mime_type or _sniff_mime(data[:12])
+            return f"data:{mime};base64,{b64encode(data).decode('ascii')}"
+
+
 def create_message_content(text: str, attachments: list[Attachment]) -> MessageContent:
     """Convert text and attachments into MessageContent format."""
     if not attachments:
@@ -89,9 +124,7 @@ def create_message_content(text: str, attachments: list[Attachment]) -> MessageC
         if attachment.type == "image" or attachment.type == "pdf":
             if not attachment.base64 and not attachment.url.startswith("data:"):
                 # If it's a file path, read and encode it
-                with open(attachment.url, "rb") as f:
-                    img_data = b64encode(f.read()).decode()
-                    url = f"data:image/jpeg;base64,{img_data}"
+                url = _file_to_data_uri(attachment.url, attachment.mime_type)
             else:
                 url = attachment.base64 or attachment.url
             content.append(create_image_block(url))
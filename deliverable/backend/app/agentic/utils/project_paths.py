@@ -1,11 +1,49 @@
 """Utility functions for finding project paths and routes."""
 
+import asyncio
+import os
 import re
+from collections import OrderedDict
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
 from loguru import logger
 
+# Router files are matched as bytes; only extracted paths are decoded
+_ROUTE_RE = re.compile(rb"<Route\s+([^>]*?)(?:/>|>)")
+_PATH_RE = re.compile(rb'path=(["\'])(.*?)\1')
+
+# Common extensions for web pages
+_PAGE_EXTENSIONS = (".js", ".jsx", ".ts", ".tsx", ".vue", ".svelte")
+
+# Router file patterns to search for
+_FILE_PATTERNS = ("App", "app", "main", "index", "router", "routes")
+
+_ROUTER_FILE_NAMES = frozenset(
+    f"{pattern}{ext}" for pattern in _FILE_PATTERNS for ext in _PAGE_EXTENSIONS
+)
+
+# Directories never holding router sources; pruned during the walk
+_DIRS_TO_SKIP = frozenset({"node_modules", ".git", "dist", "build"})
+
+# Characters marking a parameterized route; stripping them changes the length
+_PARAM_CHARS = ":*{"
+_PARAM_DETECT = str.maketrans("", "", _PARAM_CHARS)
+
+# Router files larger than this are skipped without being read
+_MAX_ROUTER_FILE_SIZE = 512 * 1024
+
+# Upper bound on router files read concurrently
+_MAX_CONCURRENT_READS = 32
+
+# Maximum number of projects whose paths are kept between calls
+_PATHS_CACHE_SIZE = 256
+
+# project root -> (watched paths, their mtimes, paths found), least recent first
+_PATHS_CACHE: "OrderedDict[Path, Tuple[List[Path], Tuple[Optional[int], ...], List[str]]]" = (
+    OrderedDict()
+)
+
 
 async def find_project_paths(project_root: Path) -> List[str]:
     """Find all valid page/routes paths in a project.
@@ -26,88 +64,180 @@ async def find_project_paths(project_root: Path) -> List[str]:
         )
         return ["/"]
 
+    # Reuse the previous result while none of the files or directories it
+    # came from changed; adding or removing an entry bumps its directory mtime
+    cached = _PATHS_CACHE.get(project_root)
+    if cached is not None:
+        watched, mtimes, cached_paths = cached
+        if await asyncio.to_thread(_stat_mtimes, watched) == mtimes:
+            _PATHS_CACHE.move_to_end(project_root)
+            return list(cached_paths)
+
+    router_files, visited_dirs = await asyncio.to_thread(
+        _find_router_files, project_root
+    )
+
+    # Stat before parsing so edits made while parsing invalidate the entry
+    watched = [*visited_dirs, *router_files]
+    mtimes = await asyncio.to_thread(_stat_mtimes, watched)
+
     # Find valid paths from router files
-    paths = _find_router_based_paths(project_root)
+    paths = await _find_router_based_paths(router_files)
 
     # Add root path if not already present
     if "/" not in paths:
         paths.append("/")
 
-    # Remove duplicates and sort for consistent output
-    paths = sorted(list(set(paths)))
+    # Paths are already unique; sort for consistent output
+    paths.sort()
+
+    _PATHS_CACHE[project_root] = (watched, mtimes, list(paths))
+    _PATHS_CACHE.move_to_end(project_root)
+    while len(_PATHS_CACHE) > _PATHS_CACHE_SIZE:
+        _PATHS_CACHE.popitem(last=False)
 
     return paths
 
 
-def _find_router_based_paths(project_root: Path) -> List[str]:
+def _stat_mtimes(paths: List[Path]) -> Tuple[Optional[int], ...]:
+    """Collect modification times, using None for paths that cannot be stat'ed.
+
+    Args:
+        paths: Paths to stat
+
+    Returns:
+        Tuple of ``st_mtime_ns`` values in the order of ``paths``
+    """
+    mtimes: List[Optional[int]] = []
+    for path in paths:
+        try:
+            mtimes.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+async def _find_router_based_paths(router_files: List[Path]) -> List[str]:
     """Find non-parameterized paths from router configuration files.
 
+    Router files are parsed in worker threads so the event loop is not
+    blocked on disk reads.
+
     Args:
-        project_root: Root directory of the project
+        router_files: Router definition files to parse
 
     Returns:
         List of valid, non-parameterized paths in the project
     """
-    non_parameterized_paths = []
+    non_parameterized_paths: set[str] = set()
+
+    semaphore = asyncio.Semaphore(_MAX_CONCURRENT_READS)
+
+    async def parse(file_path: Path) -> List[str]:
+        async with semaphore:
+            return await asyncio.to_thread(_parse_router_file, file_path)
+
+    results = await asyncio.gather(*(parse(file_path) for file_path in router_files))
 
-    # Common extensions for web pages
-    page_extensions = [".js", ".jsx", ".ts", ".tsx", ".vue", ".svelte"]
+    for file_paths in results:
+        non_parameterized_paths.update(file_paths)
 
-    # Router file patterns to search for
-    file_patterns = ["App", "app", "main", "index", "router", "routes"]
+    return list(non_parameterized_paths)
 
-    # Find all potential router definition files
+
+def _find_router_files(project_root: Path) -> Tuple[List[Path], List[Path]]:
+    """Find all potential router definition files in a project.
+
+    Args:
+        project_root: Root directory of the project
+
+    Returns:
+        Tuple of (router file paths, directories examined to find them)
+    """
     router_files: List[Path] = []
+    visited_dirs: List[Path] = []
 
-    def find_files_with_pattern(pattern: str, ext: str) -> List[Path]:
-        """Helper function to find files matching pattern with extension, excluding node_modules."""
-        return [
-            p
-            for p in project_root.rglob(f"{pattern}{ext}")
-            if "node_modules" not in p.parts
-        ]
-
-    # Collect all router files
-    for pattern in file_patterns:
-        for ext in page_extensions:
-            router_files.extend(find_files_with_pattern(pattern, ext))
-
-    # Process router files to extract non-parameterized routes
-    for file_path in router_files:
+    # Projects without any router file near the top are not worth walking
+    if not _has_top_level_router_file(project_root):
+        return router_files, [project_root, project_root / "src"]
+
+    # Find all potential router definition files in a single pruned walk
+    for dirpath, dirnames, filenames in os.walk(project_root):
+        dirnames[:] = [d for d in dirnames if d not in _DIRS_TO_SKIP]
+        visited_dirs.append(Path(dirpath))
+        for filename in filenames:
+            if filename in _ROUTER_FILE_NAMES:
+                router_files.append(Path(dirpath) / filename)
+
+    return router_files, visited_dirs
+
+
+def _has_top_level_router_file(project_root: Path) -> bool:
+    """Check the project root and its ``src`` directory for router files.
+
+    Args:
+        project_root: Root directory of the project
+
+    Returns:
+        True if either directory directly contains a router file name
+    """
+    for directory in (project_root, project_root / "src"):
         try:
-            if file_path.exists():
-                with open(file_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                    logger.debug(f"Processing router file: {file_path}")
+            with os.scandir(directory) as entries:
+                if any(entry.name in _ROUTER_FILE_NAMES for entry in entries):
+                    return True
+        except OSError:
+            continue
+    return False
 
-                    # Find Route components in the file
-                    route_elements = re.findall(r"<Route\s+([^>]*?)(?:/>|>)", content)
 
-                    for route_attrs in route_elements:
-                        # Extract the path attribute value
-                        path_match = re.search(r'path=(["\'])(.*?)\1', route_attrs)
+def _parse_router_file(file_path: Path) -> List[str]:
+    """Extract non-parameterized route paths from a single router file.
 
-                        if not path_match:
-                            continue
+    Args:
+        file_path: Path to the router file
+
+    Returns:
+        List of normalized route paths found in the file
+    """
+    paths: List[str] = []
 
-                        path = path_match.group(2).strip()
+    try:
+        with open(file_path, "rb") as f:
+            # Route configs are small; anything larger is a bundle or vendor file
+            if os.fstat(f.fileno()).st_size > _MAX_ROUTER_FILE_SIZE:
+                logger.debug("Skipping oversized router file: {}", file_path)
+                return paths
 
-                        # Only add non-parameterized routes
-                        if not any(
-                            param_marker in path for param_marker in [":", "*", "{"]
-                        ):
-                            if path:
-                                # Normalize path to start with / and not end with / (except root)
-                                if not path.startswith("/"):
-                                    path = "/" + path
+            content = f.read()
+            logger.debug("Processing router file: {}", file_path)
 
-                                if len(path) > 1:
-                                    path = path.rstrip("/")
+            # Find Route components in the file
+            route_elements = _ROUTE_RE.findall(content)
 
-                                if path and path not in non_parameterized_paths:
-                                    non_parameterized_paths.append(path)
+            for route_attrs in route_elements:
+                # Extract the path attribute value
+                path_match = _PATH_RE.search(route_attrs)
 
-        except Exception as e:
-            logger.warning(f"Error processing router file {file_path}: {str(e)}")
+                if not path_match:
+                    continue
 
-    return non_parameterized_paths
+                path = path_match.group(2).decode("utf-8", errors="replace").strip()
+
+                # Only add non-parameterized routes
+                if len(path.translate(_PARAM_DETECT)) == len(path):
+                    if path:
+                        # Normalize path to start with / and not end with / (except root)
+                        if not path.startswith("/"):
+                            path = "/" + path
+
+                        if len(path) > 1:
+                            path = path.rstrip("/")
+
+                        if path:
+                            paths.append(path)
+
+    except OSError as e:
+        logger.warning(f"Error processing router file {file_path}: {str(e)}")
+
+    return paths
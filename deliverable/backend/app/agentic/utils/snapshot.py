@@ -1,16 +1,74 @@
 """Git snapshot utilities for generating commit messages using LLM."""
 
-import shlex
+import asyncio
 import subprocess
-from typing import List, Optional, cast
+import weakref
+from typing import List, Optional, Set, Tuple, Union, cast
 
 from litellm import acompletion
 from litellm.types.utils import Choices, ModelResponse
 from loguru import logger
+from pydantic import BaseModel
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from app.agentic.utils.llm_cache import Uncached, llm_cache
 from app.config import configs
 
+# Size limit for coalescing concurrent commit message requests
+_BATCH_MAX_SIZE = 8
+
+# Diffs longer than this are summarized before being sent to the LLM
+_MAX_PROMPT_DIFF_CHARS = 8000
+_TRUNCATION_MARKER = "\n… truncated …\n"
+
+_COMMIT_MESSAGE_SYSTEM_PROMPT = """You write git commit messages for the diffs you are given.
+Start with a summary of 50 chars or less in imperative mood ("Add feature"), \
+optionally followed by a blank line and a short body on the what and why.
+Respond with a JSON object {"message": "<commit message>"}."""
+
+
+class CommitMessageResponse(BaseModel):
+    """Commit message response from LLM."""
+
+    message: str
+
+
+class CommitMessagesResponse(BaseModel):
+    """Batched commit messages response from LLM."""
+
+    messages: List[str]
+
+
+async def _run_git(path: str, *args: str) -> str:
+    """Run a git command in ``path`` without blocking the event loop.
+
+    Args:
+        path: Working directory for the command
+        *args: Arguments passed to git
+
+    Returns:
+        The command's stdout
+
+    Raises:
+        subprocess.CalledProcessError: If git exits with a non-zero status
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "git",
+        *args,
+        cwd=path,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode:
+        raise subprocess.CalledProcessError(
+            proc.returncode,
+            ["git", *args],
+            output=stdout.decode(errors="replace"),
+            stderr=stderr.decode(errors="replace"),
+        )
+    return stdout.decode(errors="replace")
+
 
 async def get_git_diff(path: str) -> str:
     """Get git diff for the specified path.
@@ -25,23 +83,56 @@ async def get_git_diff(path: str) -> str:
         RuntimeError: If git command fails
     """
     try:
-        cmd = f"cd {shlex.quote(path)} && git diff"
-        result = subprocess.run(
-            cmd, shell=True, capture_output=True, text=True, check=True
-        )
-        return result.stdout
+        return await _run_git(path, "diff")
     except subprocess.CalledProcessError as e:
         error_msg = f"Failed to get git diff: {e.stderr}"
         logger.error(error_msg)
         raise RuntimeError(error_msg) from e
 
 
+def _truncate_diff(diff: str, limit: int = _MAX_PROMPT_DIFF_CHARS) -> str:
+    """Cap a diff at ``limit`` characters, keeping its head."""
+    if len(diff) <= limit:
+        return diff
+    return diff[: max(limit - len(_TRUNCATION_MARKER), 0)] + _TRUNCATION_MARKER
+
+
+async def get_diff_for_prompt(path: str, diff: str) -> str:
+    """Reduce a large git diff to something worth sending to the LLM.
+
+    Small diffs are returned unchanged. Large ones are replaced by the
+    ``git diff --stat`` summary followed by the head of the diff.
+
+    Args:
+        path: Path the diff was taken from
+        diff: The full git diff
+
+    Returns:
+        Diff text capped at ``_MAX_PROMPT_DIFF_CHARS`` characters
+    """
+    if len(diff) <= _MAX_PROMPT_DIFF_CHARS:
+        return diff
+
+    try:
+        stat = await _run_git(path, "diff", "--stat")
+    except subprocess.CalledProcessError:
+        return _truncate_diff(diff)
+
+    stat_limit = _MAX_PROMPT_DIFF_CHARS // 2
+    if len(stat) > stat_limit:
+        # Keep the trailing "N files changed" totals line
+        files, _, totals = stat.rstrip("\n").rpartition("\n")
+        stat = _truncate_diff(files, stat_limit - len(totals) - 1) + totals + "\n"
+    return stat + "\n" + _truncate_diff(diff, _MAX_PROMPT_DIFF_CHARS - len(stat) - 1)
+
+
+@llm_cache()
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=4, max=10),
     reraise=True,
 )
-async def generate_commit_message(diff: str) -> str:
+async def generate_commit_message(diff: str) -> Union[str, Uncached[str]]:
     """Generate a commit message from a git diff using LLM.
 
     Args:
@@ -56,36 +147,172 @@ async def generate_commit_message(diff: str) -> str:
     if not diff.strip():
         return "No changes to commit"
 
-    prompt = f"""Given the following git diff, please generate a clear and concise commit message that follows best practices.
-The message should:
-- Start with a brief summary (50 chars or less)
-- Use imperative mood ("Add feature" not "Added feature")
-- Include relevant details in body if needed
-- Focus on the "what" and "why", not the "how"
-
-Git diff:
-{diff}
-
-Generate only the commit message without any additional text or explanation."""
+    diff = _truncate_diff(diff)
 
     response = cast(
         ModelResponse,
         await acompletion(
             model=configs.DEFAULT_MODEL,
             messages=[
-                {
-                    "role": "system",
-                    "content": "You are a commit message generator that follows git commit message best practices.",
-                },
-                {"role": "user", "content": prompt},
+                {"role": "system", "content": _COMMIT_MESSAGE_SYSTEM_PROMPT},
+                {"role": "user", "content": diff},
             ],
             api_base=configs.DEFAULT_LLM_URL,
             api_key=configs.DEFAULT_MODEL_API_KEY,
-            temperature=0.7,
+            temperature=0.2,
+            response_format={"type": "json_object"},
         ),
     )
 
-    return cast(List[Choices], response.choices)[0].message.content or "misc changes"
+    content = cast(List[Choices], response.choices)[0].message.content or "{}"
+    try:
+        message = CommitMessageResponse.model_validate_json(content).message
+    except Exception as e:
+        logger.warning(f"Error parsing commit message response: {e}")
+        # Use the raw reply this time, but don't cache it
+        return Uncached(content.strip() or "misc changes")
+
+    return message or "misc changes"
+
+
+async def generate_commit_messages_batch(diffs: List[str]) -> List[str]:
+    """Generate commit messages for several git diffs with a single LLM call.
+
+    Falls back to one call per diff if the batched response cannot be parsed
+    or does not contain one message per diff.
+
+    Args:
+        diffs: The git diffs to analyze
+
+    Returns:
+        Generated commit messages, in the same order as ``diffs``
+    """
+    messages = ["No changes to commit"] * len(diffs)
+    pending = [i for i, diff in enumerate(diffs) if diff.strip()]
+    if not pending:
+        return messages
+    if len(pending) == 1:
+        messages[pending[0]] = await generate_commit_message(diffs[pending[0]])
+        return messages
+
+    # Share the prompt budget between the diffs
+    limit = _MAX_PROMPT_DIFF_CHARS // len(pending)
+    numbered = "\n\n".join(
+        f"### Diff {n}\n{_truncate_diff(diffs[i], limit)}"
+        for n, i in enumerate(pending, 1)
+    )
+    prompt = f"""Given the following {len(pending)} numbered git diffs, generate one clear and concise commit message per diff.
+Each message should start with a brief summary (50 chars or less) in imperative mood.
+
+{numbered}
+
+Respond with a JSON object {{"messages": [...]}} holding exactly {len(pending)} strings, in diff order."""
+
+    try:
+        response = cast(
+            ModelResponse,
+            await acompletion(
+                model=configs.DEFAULT_MODEL,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are a commit message generator that follows git commit message best practices.",
+                    },
+                    {"role": "user", "content": prompt},
+                ],
+                api_base=configs.DEFAULT_LLM_URL,
+                api_key=configs.DEFAULT_MODEL_API_KEY,
+                temperature=0.2,
+                response_format={"type": "json_object"},
+            ),
+        )
+        content = cast(List[Choices], response.choices)[0].message.content or "{}"
+        generated = CommitMessagesResponse.model_validate_json(content).messages
+        if len(generated) != len(pending):
+            raise ValueError(
+                f"expected {len(pending)} messages, got {len(generated)}"
+            )
+    except Exception as e:
+        logger.warning(f"Batched commit message generation failed: {e}")
+        generated = await asyncio.gather(
+            *(generate_commit_message(diffs[i]) for i in pending)
+        )
+
+    for i, message in zip(pending, generated):
+        messages[i] = message or "misc changes"
+    return messages
+
+
+class _CommitMessageBatcher:
+    """Coalesce commit message requests made in the same loop iteration.
+
+    Requests are flushed once ``_BATCH_MAX_SIZE`` are pending or on the next
+    iteration of the event loop, so a lone request is never held back
+    waiting for others.
+    """
+
+    def __init__(self) -> None:
+        self._pending: List[Tuple[str, "asyncio.Future[str]"]] = []
+        self._flush_handle: Optional[asyncio.Handle] = None
+        # The loop only keeps weak references to tasks; a collected batch
+        # would leave its submitters waiting forever
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    async def submit(self, diff: str) -> str:
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[str]" = loop.create_future()
+        self._pending.append((diff, future))
+
+        if len(self._pending) >= _BATCH_MAX_SIZE:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_soon(self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, "asyncio.Future[str]"]]) -> None:
+        try:
+            messages = await generate_commit_messages_batch([d for d, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), message in zip(batch, messages):
+            if not future.done():
+                future.set_result(message)
+
+
+# One batcher per event loop, dropped together with its loop
+_batchers: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+async def generate_commit_message_coalesced(diff: str) -> str:
+    """Generate a commit message, batching with concurrent requests.
+
+    Args:
+        diff: The git diff content to analyze
+
+    Returns:
+        Generated commit message
+    """
+    loop = asyncio.get_running_loop()
+    batcher = _batchers.get(loop)
+    if batcher is None:
+        batcher = _batchers[loop] = _CommitMessageBatcher()
+    return await batcher.submit(diff)
 
 
 async def create_snapshot(path: str, commit_message: Optional[str] = None) -> str:
@@ -112,15 +339,14 @@ async def create_snapshot(path: str, commit_message: Optional[str] = None) -> st
 
         # Use provided commit message or generate one
         if commit_message is None:
-            commit_message = await generate_commit_message(diff)
+            prompt_diff = await get_diff_for_prompt(path, diff)
+            commit_message = await generate_commit_message_coalesced(prompt_diff)
 
-        # Stage and commit changes using shell
-        cmd = f"""cd {shlex.quote(path)} && git add . && git commit -m {shlex.quote(commit_message)}"""
-        result = subprocess.run(
-            cmd, shell=True, capture_output=True, text=True, check=True
-        )
+        # Stage and commit changes
+        await _run_git(path, "add", ".")
+        output = await _run_git(path, "commit", "-m", commit_message)
 
-        logger.info(f"Created git commit: {result.stdout}")
+        logger.info(f"Created git commit: {output}")
         return commit_message
 
     except Exception as e:
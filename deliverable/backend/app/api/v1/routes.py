@@ -1,25 +1,34 @@
 import asyncio
 """API v1 routes."""
 
+import mimetypes
 import os
 import threading
-import json
-import queue
-from flask import jsonify, request, current_app, send_file, after_this_request, Response, stream_with_context
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import is_dataclass
+import orjson
+from flask import jsonify, request, current_app, Response, send_file, stream_with_context
 from app.api.v1 import api_v1_bp
 from app.projects import (
     create_project, 
     get_all_projects, 
     delete_project, 
     get_project_by_id, 
-    create_project_zip, 
-    cleanup_zip_file,
+    stream_project_zip,
     get_project_commit_history,
     switch_project_commit,
     get_project_files,
-    get_file_content
+    get_file_content,
+    get_file_metadata,
+    open_project_file
 )
-from app.agentic.utils.agent_helpers import get_agent
+from app.agentic.types import TextEvent, ThinkingEvent, ToolEvent
+from app.agentic.utils.agent_helpers import agent_run_lock, forget_agent, get_agent
+from app.background_loop import submit
+from app.config import configs
+from app.shutdown import shutting_down
 
 @api_v1_bp.route('/hello', methods=['GET'])
 def hello():
@@ -27,6 +36,159 @@ def hello():
     return jsonify({"message": "Hello from the Backend API!"})
 
 
+def _tool_event_to_dict(ev: ToolEvent) -> dict:
+    event_dict = {
+        "type": "tool",
+        "tool_name": ev.tool_name,
+        "tool_id": ev.tool_id,
+        "status": ev.status,
+    }
+    if ev.params is not None:
+        event_dict["params"] = ev.params
+    if ev.result is not None:
+        event_dict["content"] = ev.result
+    if ev.error is not None:
+        event_dict["error"] = ev.error
+    return event_dict
+
+
+# Agent event type -> SSE payload
+_EVENT_SERIALIZERS = {
+    TextEvent: lambda ev: {"type": "text", "content": ev.text},
+    ToolEvent: _tool_event_to_dict,
+    ThinkingEvent: lambda ev: {"type": "thinking", "status": "thinking"},
+}
+
+
+class _FrameBuffer:
+    """Hand-off buffer between one producer and one SSE stream.
+
+    The producer appends under a lock and only signals on the empty to
+    non-empty transition; the consumer swaps the whole list out at once, so
+    synchronization is paid per batch rather than per frame. ``None`` is the
+    end-of-stream sentinel.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._frames: list[bytes | None] = []
+
+    def put(self, frame: bytes | None) -> None:
+        with self._lock:
+            self._frames.append(frame)
+            if len(self._frames) == 1:
+                self._ready.set()
+
+    def pending(self) -> int:
+        return len(self._frames)
+
+    def take(self, timeout: float | None = None) -> list[bytes | None]:
+        """Wait up to ``timeout`` for frames and take all pending ones."""
+        if not self._ready.wait(timeout):
+            return []
+        with self._lock:
+            frames, self._frames = self._frames, []
+            self._ready.clear()
+        return frames
+
+
+class _ChatBroadcast:
+    """Fan out the SSE frames of one agent run to every subscribed stream.
+
+    Each event is serialized exactly once; subscribers receive the encoded
+    frame. The last ``SSE_QUEUE_MAX`` frames are kept for the lifetime of
+    the run so that a stream joining late (e.g. a client retrying the same
+    message) replays them; on a longer run a late joiner only gets that tail.
+    """
+
+    def __init__(self, message: str):
+        self.message = message
+        self._lock = threading.Lock()
+        self._frames: deque[bytes] = deque(maxlen=configs.SSE_QUEUE_MAX)
+        self._subscribers: list[_FrameBuffer] = []
+        self._closed = False
+        self._run: Future | None = None
+
+    @property
+    def has_subscribers(self) -> bool:
+        with self._lock:
+            return bool(self._subscribers)
+
+    def subscribe(self) -> _FrameBuffer:
+        q = _FrameBuffer()
+        with self._lock:
+            for frame in self._frames:
+                q.put(frame)
+            if self._closed:
+                q.put(None)
+            else:
+                self._subscribers.append(q)
+        return q
+
+    def unsubscribe(self, q: _FrameBuffer) -> None:
+        with self._lock:
+            if q in self._subscribers:
+                self._subscribers.remove(q)
+            abandoned = not self._subscribers and not self._closed
+            run = self._run
+        # The last stream went away (e.g. the client disconnected): stop the
+        # agent right away rather than at its next event
+        if abandoned and run is not None:
+            run.cancel()
+
+    def attach_run(self, run: Future) -> None:
+        """Register the producer run so it is cancelled once abandoned."""
+        with self._lock:
+            self._run = run
+            abandoned = not self._subscribers and not self._closed
+        if abandoned:
+            run.cancel()
+
+    async def publish(self, ev, droppable: bool = False) -> None:
+        """Deliver an event to every subscriber.
+
+        A subscriber with ``SSE_QUEUE_MAX`` frames pending applies
+        backpressure: the producer waits for it to drain instead of buffering
+        without bound. ``droppable`` frames are skipped for such subscribers.
+        """
+        # Each SSE event must end with two newlines
+        frame = b"data: " + orjson.dumps(ev) + b"\n\n"
+        with self._lock:
+            self._frames.append(frame)
+            subscribers = list(self._subscribers)
+
+        for q in subscribers:
+            while q.pending() >= configs.SSE_QUEUE_MAX:
+                if droppable or not self._is_subscribed(q):
+                    break
+                await asyncio.sleep(_BACKPRESSURE_POLL_SECONDS)
+            else:
+                q.put(frame)
+
+    def _is_subscribed(self, q: _FrameBuffer) -> bool:
+        with self._lock:
+            return q in self._subscribers
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            for q in self._subscribers:
+                q.put(None)
+            self._subscribers.clear()
+
+
+# How often a producer blocked on a slow subscriber rechecks its buffer
+_BACKPRESSURE_POLL_SECONDS = 0.01
+
+# How often an idle SSE stream wakes to check for shutdown
+_STREAM_POLL_SECONDS = 0.5
+
+# Active agent runs by project ID
+_project_broadcasts: dict[str, _ChatBroadcast] = {}
+_broadcasts_lock = threading.Lock()
+
+
 @api_v1_bp.route("/chat", methods=["POST"])
 def chat_endpoint():
     """
@@ -50,67 +212,89 @@ def chat_endpoint():
     if not project:
         return jsonify({"error": "Project not found"}), 404
 
-    agent = get_agent(project_id)
-
-    # 2) Bridge async generator  → sync Flask response -----------------------
-    q: queue.Queue[dict | None] = queue.Queue()
+    # 2) Join the project's run for this message, or start a new one --------
+    with _broadcasts_lock:
+        broadcast = _project_broadcasts.get(project_id)
+        start = broadcast is None or broadcast.message != message
+        if start:
+            broadcast = _ChatBroadcast(message)
+            _project_broadcasts[project_id] = broadcast
+        q = broadcast.subscribe()
 
     async def _produce() -> None:
-        """Collect events from the async agent and push them into the queue."""
+        """Collect events from the async agent and publish them to subscribers."""
         try:
-            async for ev in agent.run(message):
-                # Convert StreamEvent objects to dictionaries
-                if hasattr(ev, '__dataclass_fields__'):
-                    # If it's a TextEvent, create a dict with type and content
-                    if hasattr(ev, 'text'):
-                        q.put({"type": "text", "content": ev.text})
-                    # If it's a ToolEvent, convert all fields to dict
-                    elif hasattr(ev, 'tool_name') and hasattr(ev, 'tool_id'):
-                        event_dict = {
-                            "type": "tool",
-                            "type": "tool", 
-                            "tool_name": ev.tool_name,
-                            "tool_id": ev.tool_id,
-                            "status": ev.status
-                        }
-                        if hasattr(ev, 'params') and ev.params is not None:
-                            event_dict["params"] = ev.params
-                        if hasattr(ev, 'result') and ev.result is not None:
-                            event_dict["content"] = ev.result
-                        if hasattr(ev, 'error') and ev.error is not None:
-                            event_dict["error"] = ev.error
-                        q.put(event_dict)
-                    # Handle ThinkingEvent
-                    elif hasattr(ev, 'thinking') or hasattr(ev, '__class__') and ev.__class__.__name__ == 'ThinkingEvent':
-                        q.put({"type": "thinking", "status": "thinking"})
+            # Wait for any run still in progress in this project to finish
+            # first, including one on an agent forget_agent has since dropped
+            async with agent_run_lock(project_id):
+                async for ev in agent.run(message):
+                    serialize = _EVENT_SERIALIZERS.get(type(ev))
+                    if serialize is not None:
+                        event = serialize(ev)
+                    elif is_dataclass(ev):
+                        # For any other event types, just convert to dict
+                        event = vars(ev)
                     else:
-                        # For any other types, just convert to dict
-                        q.put(vars(ev))
-                else:
-                    # If it's already a dict or other JSON-serializable object
-                    q.put(ev)
+                        # If it's already a dict or other JSON-serializable object
+                        event = ev
+                    await broadcast.publish(event, droppable=type(ev) is ThinkingEvent)
+
+                    # Every stream disconnected: stop the agent instead of
+                    # generating output nobody will read
+                    if not broadcast.has_subscribers:
+                        break
         except Exception as exc:
-            q.put({"type": "error", "error": str(exc)})
+            await broadcast.publish({"type": "error", "error": str(exc)})
         finally:
-            # Sentinel value means "we're done – close the stream".
-            q.put(None)
+            with _broadcasts_lock:
+                if _project_broadcasts.get(project_id) is broadcast:
+                    del _project_broadcasts[project_id]
+            # Wakes every subscriber with the end-of-stream sentinel
+            broadcast.close()
 
-    # Run the async producer in a background thread so the main
-    # Flask worker is free to yield events immediately.
-    threading.Thread(
-        target=lambda: asyncio.run(_produce()),
-        daemon=True,
-    ).start()
-
-    # 3) Flask generator that reads from the queue and emits SSE -------------
+    if start:
+        try:
+            agent = get_agent(project_id)
+        except Exception:
+            with _broadcasts_lock:
+                if _project_broadcasts.get(project_id) is broadcast:
+                    del _project_broadcasts[project_id]
+            broadcast.close()
+            raise
+        # Run the async producer on the project's background loop so the main
+        # Flask worker is free to yield events immediately.
+        broadcast.attach_run(submit(_produce(), key=project_id))
+
+    # 3) Flask generator that reads from the buffer and emits SSE -------------
     @stream_with_context
     def event_stream():
-        while True:
-            ev = q.get()
-            if ev is None:               # <- sentinel received
-                break
-            # Each SSE event must end with two newlines
-            yield f"data: {json.dumps(ev, ensure_ascii=False)}\n\n"
+        coalesce = configs.SSE_COALESCE_SECONDS
+        keepalive = configs.SSE_KEEPALIVE_SECONDS
+        idle = 0.0
+        try:
+            # Wake periodically so shutdown is noticed during long pauses;
+            # keepalive comments stop proxies from closing an idle stream
+            # and surface client disconnects on the next write
+            while not shutting_down.is_set():
+                frames = q.take(timeout=_STREAM_POLL_SECONDS)
+                if not frames:
+                    idle += _STREAM_POLL_SECONDS
+                    if idle >= keepalive:
+                        idle = 0.0
+                        yield b": keepalive\n\n"
+                    continue
+                idle = 0.0
+                if coalesce and None not in frames:
+                    # Let a burst accumulate so it goes out in one write
+                    time.sleep(coalesce)
+                    frames += q.take(timeout=0)
+                # Frames are pre-encoded once for all subscribers
+                if None in frames:           # <- sentinel received
+                    yield b"".join(frames[:frames.index(None)])
+                    break
+                yield b"".join(frames)
+        finally:
+            broadcast.unsubscribe(q)
 
     # 4) Return the streaming response --------------------------------------
     headers = {
@@ -158,20 +342,19 @@ def chat_sync_endpoint():
     async def run_agent():
         events = []
         try:
-            async for event in agent.run(message):
-                events.append(event)
+            # Serialized with /chat runs in the same project
+            async with agent_run_lock(project_id):
+                async for event in agent.run(message):
+                    events.append(event)
             return events
         except Exception as e:
             error_event = {"type": "error", "error": str(e)}
             events.append(error_event)
             return events
 
-    # Run the coroutine in the event loop
+    # Run the coroutine on the project's background loop
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        events = loop.run_until_complete(run_agent())
-        loop.close()
+        events = submit(run_agent(), key=project_id).result()
         return jsonify({"events": events})
     except Exception as e:
         current_app.logger.error(f"Error in chat-sync: {str(e)}")
@@ -223,6 +406,7 @@ def delete_project_endpoint(project_id):
         500: Server error
     """
     result, status_code = delete_project(project_id)
+    forget_agent(project_id)
     return jsonify(result), status_code
 
 
@@ -249,29 +433,15 @@ def download_project_endpoint(project_id):
         if not project_path or not os.path.exists(project_path):
             return jsonify({"error": f"Project directory for {project_id} not found"}), 404
         
-        # Create zip file
-        zip_path, zip_filename = create_project_zip(project_id)
-        
-        # Schedule cleanup in a separate thread after sending the response
-        def delayed_cleanup():
-            # Give the response time to be sent
-            timer = threading.Timer(60.0, cleanup_zip_file, args=[zip_path])
-            timer.daemon = True
-            timer.start()
-        
-        # Register our cleanup function to be called after the request
-        @after_this_request
-        def schedule_cleanup(response):
-            if response.status_code == 200:
-                threading.Thread(target=delayed_cleanup).start()
-            return response
-        
-        # Send the file as an attachment
-        return send_file(
-            zip_path,
-            as_attachment=True,
-            download_name=zip_filename,
-            mimetype='application/zip'
+        # Stream the archive as it is built; nothing is written to disk
+        stream, zip_filename = stream_project_zip(project_id)
+        return Response(
+            stream,
+            mimetype='application/zip',
+            headers={
+                "Content-Disposition": f'attachment; filename="{zip_filename}"',
+                "Cache-Control": "no-cache",
+            }
         )
         
     except FileNotFoundError as e:
@@ -333,6 +503,7 @@ def switch_project_commit_endpoint(project_id):
             return jsonify({"error": "Invalid commit_hash parameter"}), 400
         
         result, status_code = switch_project_commit(project_id, commit_hash)
+        forget_agent(project_id)
         return jsonify(result), status_code
         
     except Exception as e:
@@ -342,17 +513,26 @@ def switch_project_commit_endpoint(project_id):
 
 @api_v1_bp.route('/projects/<project_id>/files', methods=['GET'])
 def get_project_files_endpoint(project_id):
-    """Get all files in a project.
+    """Get all files in a project, or the contents of several files at once.
     
     Args:
         project_id: The unique ID of the project
         
+    Query Parameters:
+        include_content: When "1", stream the contents of the files in `paths`
+        paths: Relative file path, repeated once per file (with include_content)
+        
     Returns:
-        200: List of files in the project
+        200: List of files in the project, or NDJSON with one
+             {"path", "status", ...} record per requested file
+        400: include_content without paths
         404: Project not found
         500: Server error
     """
     try:
+        if request.args.get('include_content') in ('1', 'true'):
+            return _stream_file_contents(project_id)
+
         files, status_code = get_project_files(project_id)
         return jsonify(files), status_code
         
@@ -361,6 +541,25 @@ def get_project_files_endpoint(project_id):
         return jsonify({"error": f"Failed to get project files: {str(e)}"}), 500
 
 
+def _stream_file_contents(project_id):
+    """Stream the contents of the files listed in `paths` as NDJSON."""
+    # Repeated ?paths= arguments, so file names may contain commas
+    paths = [path for path in request.args.getlist('paths') if path]
+    if not paths:
+        return jsonify({"error": "paths query parameter is required with include_content"}), 400
+
+    if not get_project_by_id(project_id):
+        return jsonify({"error": f"Project {project_id} not found"}), 404
+
+    def generate():
+        for path in paths:
+            result, status_code = get_file_content(project_id, path)
+            record = {"path": path, "status": status_code, **result}
+            yield orjson.dumps(record) + b"\n"
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+
 @api_v1_bp.route('/projects/<project_id>/files/content', methods=['GET'])
 def get_file_content_endpoint(project_id):
     """Get the content of a specific file in a project.
@@ -370,9 +569,13 @@ def get_file_content_endpoint(project_id):
         
     Query Parameters:
         path: Relative path to the file within the project
+        raw: If "1", send the file bytes instead of a JSON document
+        metadata_only: If "1", return the size and modification time
+            without reading the file
         
     Returns:
-        200: File content and metadata
+        200: File content and metadata, metadata only, or the raw file
+        304: Raw file not modified since the client's copy
         400: Invalid file path or not a text file
         404: Project or file not found
         500: Server error
@@ -383,10 +586,36 @@ def get_file_content_endpoint(project_id):
         
         if not file_path:
             return jsonify({"error": "File path query parameter is required"}), 400
+        
+        # Editors poll this to detect external changes; answer from the
+        # file's stat without reading it
+        if request.args.get('metadata_only') == '1':
+            result, status_code = get_file_metadata(project_id, file_path)
+            response = jsonify(result)
+            if status_code == 200:
+                response.headers['Cache-Control'] = 'max-age=1'
+            return response, status_code
+        
+        # Raw files are handed to send_file, which uses sendfile(2) through
+        # the WSGI file wrapper and answers conditional requests
+        if request.args.get('raw') == '1':
+            result, status_code = open_project_file(project_id, file_path)
+            if status_code != 200:
+                return jsonify(result), status_code
+            file_stat = os.fstat(result.fileno())
+            return send_file(
+                result,
+                mimetype=mimetypes.guess_type(file_path)[0] or 'text/plain',
+                conditional=True,
+                etag=f"{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}",
+                last_modified=file_stat.st_mtime,
+            )
             
-        # Get file content
+        # Get file content. Serialized straight to bytes with orjson: going
+        # through jsonify would decode orjson's output to str and re-encode
+        # it, two extra passes over the whole file
         result, status_code = get_file_content(project_id, file_path)
-        return jsonify(result), status_code
+        return Response(orjson.dumps(result), status=status_code, mimetype='application/json')
         
     except Exception as e:
         current_app.logger.error(f"Error getting file content for project {project_id}: {str(e)}")
@@ -0,0 +1,62 @@
+"""Process-wide asyncio event loops for running coroutines from sync code.
+
+Flask views run in WSGI worker threads without an event loop. Rather than
+creating (and tearing down) a loop per request, coroutines are submitted to
+long-lived loops running in daemon threads. There is one loop per CPU; work
+submitted with a key (e.g. a project ID) always lands on the same loop, so it
+stays ordered while different keys spread across threads.
+"""
+
+import asyncio
+import os
+import threading
+import zlib
+from concurrent.futures import Future
+from typing import Any, Coroutine, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def _start_loop(index: int) -> asyncio.AbstractEventLoop:
+    loop = asyncio.new_event_loop()
+    threading.Thread(
+        target=loop.run_forever, name=f"background-loop-{index}", daemon=True
+    ).start()
+    return loop
+
+
+_loops: List[asyncio.AbstractEventLoop] = [
+    _start_loop(i) for i in range(os.cpu_count() or 1)
+]
+
+# Loop used for work that has no affinity key
+background_loop = _loops[0]
+
+
+def get_loop(key: Optional[str] = None) -> asyncio.AbstractEventLoop:
+    """Return the background loop responsible for ``key``.
+
+    Args:
+        key: Affinity key; None selects the default loop
+
+    Returns:
+        The event loop to run the work on
+    """
+    if key is None:
+        return background_loop
+    return _loops[zlib.crc32(key.encode()) % len(_loops)]
+
+
+def submit(
+    coro: Coroutine[Any, Any, T], key: Optional[str] = None
+) -> "Future[T]":
+    """Schedule a coroutine on a background loop.
+
+    Args:
+        coro: The coroutine to run
+        key: Optional affinity key; coroutines with the same key share a loop
+
+    Returns:
+        A concurrent future resolving to the coroutine's result
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_loop(key))
@@ -4,9 +4,11 @@ This module contains all the configuration parameters for the application,
 which can be customized via environment variables.
 """
 
+import functools
 import os
 import sys
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
+from pathlib import Path
 from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
 
@@ -14,13 +16,28 @@ from dotenv import load_dotenv
 ENV = os.getenv("ENV", "development")
 ENV_FILE = f".env.{ENV}"
 
-# Load environment variables from .env file
-if os.path.exists(ENV_FILE):
-    load_dotenv(ENV_FILE)
-else:
-    print(f"Warning: Environment file {ENV_FILE} not found. Using default values.")
 
-@dataclass
+# Set once the env file is loaded; survives module re-imports and is inherited
+# by reloader child processes, which already see the loaded variables
+_ENV_LOADED_MARKER = "_APP_ENV_FILE_LOADED"
+
+
+@functools.lru_cache(maxsize=1)
+def _load_env_file() -> None:
+    """Load environment variables from the .env file, once per process."""
+    if os.environ.get(_ENV_LOADED_MARKER) == ENV_FILE:
+        return
+    if Path(ENV_FILE).is_file():
+        load_dotenv(ENV_FILE, override=False)
+        os.environ[_ENV_LOADED_MARKER] = ENV_FILE
+    else:
+        print(f"Warning: Environment file {ENV_FILE} not found. Using default values.")
+
+
+_load_env_file()
+
+
+@dataclass(frozen=True, slots=True)
 class Config:
     """Application configuration."""
     
@@ -40,6 +57,15 @@ class Config:
     API_V1_PREFIX: str = os.environ.get("API_V1_PREFIX", "/api/v1")
     PROJECT_NAME: str = os.environ.get("PROJECT_NAME", "Backend")
     VERSION: str = os.environ.get("VERSION", "0.1.0")
+
+    # Streaming configuration
+    SSE_COALESCE_SECONDS: float = float(os.environ.get("SSE_COALESCE_SECONDS", "0.005"))  # Window for batching SSE frames into one write
+    SSE_QUEUE_MAX: int = int(os.environ.get("SSE_QUEUE_MAX", "256"))  # Frames buffered per stream before the agent is held back
+    SSE_KEEPALIVE_SECONDS: float = float(os.environ.get("SSE_KEEPALIVE_SECONDS", "15"))  # Idle time before a keepalive comment is sent
+
+    # Project download configuration
+    ZIP_COMPRESS_LEVEL: int = int(os.environ.get("ZIP_COMPRESS_LEVEL", "1"))  # Deflate level for project zips (1 = fastest)
+    FAST_DELETE: bool = os.environ.get("FAST_DELETE", "true").lower() in ["true", "1", "yes"]  # Remove project trees with rm -rf instead of shutil.rmtree
     
 
     KB_CHROMA_CLIENT_TYPE = "persistent"
@@ -82,11 +108,7 @@ class Config:
         Returns:
             Dictionary representation of the configuration
         """
-        return {
-            key: value 
-            for key, value in self.__dict__.items() 
-            if not key.startswith("_") and key.isupper()
-        }
+        return {key: getattr(self, key) for key in _PUBLIC_KEYS}
     
     def __str__(self) -> str:
         """String representation of configuration."""
@@ -99,6 +121,11 @@ class Config:
             config_str += f"  {key}: {value}\n"
         return config_str
 
+# Public (upper-case) configuration fields, resolved once
+_PUBLIC_KEYS = tuple(
+    f.name for f in fields(Config) if not f.name.startswith("_") and f.name.isupper()
+)
+
 # Create default configuration instance
 configs = Config()
 
@@ -0,0 +1,21 @@
+"""orjson-backed JSON encoder for Flask responses."""
+
+import orjson
+from flask.json import JSONEncoder
+
+
+class OrjsonEncoder(JSONEncoder):
+    """Flask JSON encoder that serializes with orjson.
+
+    Honors the sort_keys and indent settings Flask passes in, and falls back
+    to Flask's default() for types orjson does not handle natively. Output is
+    UTF-8 rather than ASCII-escaped.
+    """
+
+    def encode(self, o) -> str:
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if self.indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(o, default=self.default, option=option).decode()
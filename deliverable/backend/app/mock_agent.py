@@ -1,49 +1,55 @@
-import time
+import asyncio
 import uuid
-from typing import Generator, Dict, Any
+from typing import AsyncGenerator, Dict, Any
 
 class Agent:
     """A very naive agent that simulates thinking, using a tool, and replying."""
 
+    # Static parts of the events; the thinking event is yielded as-is, so
+    # consumers must treat yielded events as read-only
+    _THINKING_EVENT: Dict[str, Any] = {
+        "type": "thinking",
+        "content": None,
+        "tool_name": None,
+        "tool_id": None,
+        "status": "thinking",
+    }
+    _TOOL_EVENT: Dict[str, Any] = {
+        "type": "tool",
+        "content": None,
+        "tool_name": "echo_tool",
+        "status": "running",
+    }
+    _TEXT_EVENT: Dict[str, Any] = {
+        "type": "text",
+        "tool_name": None,
+        "tool_id": None,
+        "status": "completed",
+    }
+
     def __init__(self, project_id: str):
         self.project_id = project_id
 
 
-    def run(self, message: str) -> Generator[Dict[str, Any], None, None]:
+    async def run(self, message: str) -> AsyncGenerator[Dict[str, Any], None]:
         """Simulate processing a message and yielding events.
 
         Yields a sequence of event dictionaries mimicking the behavior of a real agent.
         """
         # Thinking event
-        yield {
-            "type": "thinking",
-            "content": None,
-            "tool_name": None,
-            "tool_id": None,
-            "status": "thinking",
-        }
-        time.sleep(1)
+        yield self._THINKING_EVENT
+        await asyncio.sleep(1)
 
         # Tool event
-        tool_id = str(uuid.uuid4())
         yield {
-            "type": "tool",
-            "content": None,
-            "tool_name": "echo_tool",
-            "tool_id": tool_id,
-            "status": "running",
+            **self._TOOL_EVENT,
+            "tool_id": uuid.uuid4().hex,
             "params": {"message": message},
         }
-        time.sleep(1)
+        await asyncio.sleep(1)
 
         # Text (final response) event
-        yield {
-            "type": "text",
-            "content": f"Echo: {message}",
-            "tool_name": None,
-            "tool_id": None,
-            "status": "completed",
-        }
+        yield {**self._TEXT_EVENT, "content": f"Echo: {message}"}
 
 
 def get_agent(project_id: str) -> Agent:
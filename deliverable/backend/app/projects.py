@@ -5,18 +5,39 @@ that can be shared across different API versions.
 """
 
 import os
-import json
+import errno
+import stat
 import shutil
 import uuid
 import subprocess
 import logging
-import tempfile
 import zipfile
-from typing import Tuple, Dict, Any, Optional, List
-from datetime import datetime
+import io
+import mmap
+from collections import deque
+from operator import itemgetter
+import re
+import fnmatch
+import functools
+import fcntl
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Tuple, Dict, Any, Optional, List, Iterator, Callable
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from app.config import configs
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import pygit2
+except ImportError:
+    # Fall back to the git CLI
+    pygit2 = None
 
 # Import AI generation utilities
 try:
@@ -28,6 +49,158 @@ except ImportError:
 # Set up logger
 logger = logging.getLogger(__name__)
 
+# Size of the chunks a streamed project zip is produced in
+ZIP_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Parsed projects.json, keyed on the file's (mtime_ns, size)
+_projects_cache: Dict[str, Any] = {"key": None, "data": [], "by_id": {}}
+_projects_cache_lock = threading.Lock()
+
+# Directories left out of project file listings
+_SKIPPED_PROJECT_DIRS = frozenset({
+    "node_modules",
+    "__pycache__",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".git",
+    ".next",
+    "dist",
+    "build",
+    ".venv",
+    "venv",
+    ".env",
+    ".lovable",
+})
+
+# Files and directories always excluded from project zips, on top of the
+# project's own ignore rules
+_ZIP_EXCLUDE_PATTERNS = (
+    "__pycache__",
+    "*.pyc",
+    "*.pyo",
+    ".git",
+    ".DS_Store",
+    "node_modules",
+    "venv",
+    "env",
+    ".env",
+    "dist",
+    "build",
+    "*.log"
+)
+
+# Characters that make an exclusion pattern a glob rather than a plain name
+_GLOB_CHARS = frozenset("*?[")
+
+# Number of files read ahead of the compressor, and the largest file that is
+# buffered whole; larger files are streamed from disk in chunks
+_ZIP_READ_AHEAD_FILES = 16
+_ZIP_READ_AHEAD_MAX_FILE_SIZE = 4 * 1024 * 1024
+
+# Extensions of already-compressed formats, stored in zips without deflating
+_PRECOMPRESSED_EXTENSIONS = frozenset({
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".ico",
+    ".woff", ".woff2", ".mp3", ".mp4", ".webm",
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".br", ".7z",
+})
+
+# Pooled connections to devhost. Only connection failures are retried:
+# /start restarts the dev server, so a request that got through must not
+# be sent twice.
+_devhost_session = requests.Session()
+_devhost_session.mount("http://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=50,
+    max_retries=Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.2),
+))
+
+# <title> element of a project's index.html
+_TITLE_RE = re.compile(rb'<title>[^<]+</title>')
+
+# Files at least this large are read through mmap in get_file_content
+_MMAP_MIN_SIZE = 64 * 1024
+
+# Resolved once; None if rm isn't on PATH
+_RM_PATH = shutil.which("rm")
+
+# Initial git setup for a new project; $1/$2 are the user name/email and $3
+# the commit message
+_GIT_INIT_SCRIPT = (
+    'git init -q && git config user.name "$1" && git config user.email "$2"'
+    ' && git add . && git commit -q -m "$3"'
+)
+
+def _projects_file() -> str:
+    return os.path.join(configs.WORKSPACE_PATH, "projects.json")
+
+def _index_projects(key: Tuple[int, int], projects: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Store a freshly read or written project list in the cache."""
+    by_id = {}
+    for project in projects:
+        # Keep the first project for an ID, as a linear scan would
+        by_id.setdefault(project.get("id"), project)
+    with _projects_cache_lock:
+        _projects_cache["key"] = key
+        _projects_cache["data"] = projects
+        _projects_cache["by_id"] = by_id
+    return projects, by_id
+
+def _load_projects_index() -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Load the project list from projects.json, cached until the file changes.
+    
+    The cache is keyed on the file's mtime and size, so edits made outside
+    this process are still picked up. The returned list and dict are shared
+    and must not be mutated.
+    
+    Returns:
+        Tuple of (project list, projects by ID), empty if the file is missing
+        or invalid
+    """
+    projects_file = _projects_file()
+    try:
+        st = os.stat(projects_file)
+    except FileNotFoundError:
+        return [], {}
+    
+    key = (st.st_mtime_ns, st.st_size)
+    with _projects_cache_lock:
+        if _projects_cache["key"] == key:
+            return _projects_cache["data"], _projects_cache["by_id"]
+    
+    with open(projects_file, 'rb') as f:
+        try:
+            projects = orjson.loads(f.read())
+        except orjson.JSONDecodeError:
+            projects = []
+    
+    return _index_projects(key, projects)
+
+def _load_projects() -> List[Dict[str, Any]]:
+    """Load the cached project list; see _load_projects_index."""
+    return _load_projects_index()[0]
+
+def _save_projects(projects: List[Dict[str, Any]]) -> None:
+    """Write the project list to projects.json and refresh the cache.
+    
+    The list is written to a temporary file, synced and then renamed over
+    projects.json, so readers never see a partially written file.
+    """
+    projects_file = _projects_file()
+    tmp_file = f"{projects_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_file, 'wb') as f:
+            f.write(orjson.dumps(projects, option=orjson.OPT_INDENT_2))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, projects_file)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+    
+    st = os.stat(projects_file)
+    _index_projects((st.st_mtime_ns, st.st_size), projects)
+
 def validate_project_data(data):
     """Validate project creation data.
     
@@ -50,6 +223,127 @@ def validate_project_data(data):
     
     return errors
 
+# Errors that mean a kernel copy primitive is unsupported for this pair of
+# files, so the next fallback should be tried
+_COPY_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP}
+_REFLINK_FALLBACK_ERRNOS = _COPY_FALLBACK_ERRNOS | {errno.ENOTTY, errno.EBADF, errno.EPERM}
+
+# FICLONE ioctl from linux/fs.h, for copy-on-write clones on btrfs/XFS
+_FICLONE = 0x40049409 if sys.platform.startswith("linux") else None
+
+# Buffer size for the userspace copy fallback
+_COPY_BUFFER_SIZE = 1024 * 1024
+
+# Shared pool for template copies and zip read-ahead; the work is I/O
+# bound, so use more threads than CPUs
+_copy_executor = ThreadPoolExecutor(
+    max_workers=min(32, (os.cpu_count() or 1) * 4),
+    thread_name_prefix="project-copy",
+)
+
+def _copy_file(src_path: str, dst_path: str, st: os.stat_result, no_reflink: Optional[threading.Event] = None) -> None:
+    """Copy a file's contents, mode and times, letting the kernel move the data.
+
+    Tries a reflink clone (copy-on-write, no data copied) where the
+    filesystem supports it, then copy_file_range, then sendfile, then a
+    plain read/write loop. Each step continues from the current file
+    offsets, so a partial copy is finished by the next one. ``st`` is the
+    source's stat result, reused for the size, mode and times.
+    ``no_reflink`` is set once cloning fails, so a tree copy only probes it
+    once.
+    """
+    src_fd = os.open(src_path, os.O_RDONLY)
+    try:
+        dst_fd = os.open(dst_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            remaining = st.st_size
+            if remaining and _FICLONE and not (no_reflink and no_reflink.is_set()):
+                try:
+                    fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+                    # The clone doesn't move the file offsets
+                    os.lseek(src_fd, remaining, os.SEEK_SET)
+                    os.lseek(dst_fd, remaining, os.SEEK_SET)
+                    remaining = 0
+                except OSError as e:
+                    if e.errno not in _REFLINK_FALLBACK_ERRNOS:
+                        raise
+                    if no_reflink:
+                        no_reflink.set()
+            if remaining and hasattr(os, "copy_file_range"):
+                try:
+                    while remaining > 0:
+                        copied = os.copy_file_range(src_fd, dst_fd, remaining)
+                        if copied == 0:
+                            break
+                        remaining -= copied
+                except OSError as e:
+                    if e.errno not in _COPY_FALLBACK_ERRNOS:
+                        raise
+            if remaining > 0 and hasattr(os, "sendfile"):
+                try:
+                    while remaining > 0:
+                        copied = os.sendfile(dst_fd, src_fd, None, remaining)
+                        if copied == 0:
+                            break
+                        remaining -= copied
+                except OSError as e:
+                    if e.errno not in _COPY_FALLBACK_ERRNOS:
+                        raise
+            # Also catches files that grew since they were stat'ed
+            while chunk := os.read(src_fd, _COPY_BUFFER_SIZE):
+                os.write(dst_fd, chunk)
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+
+    os.chmod(dst_path, stat.S_IMODE(st.st_mode))
+    os.utime(dst_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+def _fast_copytree(src_dir: str, dst_dir: str) -> None:
+    """Recursively copy ``src_dir`` into ``dst_dir``.
+
+    Like ``shutil.copytree(..., dirs_exist_ok=True)`` with symlinks
+    followed, but walks with os.scandir and reuses each entry's stat result
+    instead of stat'ing every file again. Directories are created up front;
+    files are then copied in parallel, since most of the time goes to
+    syscalls that release the GIL.
+    """
+    files: List[Tuple[str, str, os.stat_result]] = []
+    pending = [(src_dir, dst_dir)]
+    while pending:
+        src, dst = pending.pop()
+        os.makedirs(dst, exist_ok=True)
+        with os.scandir(src) as entries:
+            for entry in entries:
+                dst_path = os.path.join(dst, entry.name)
+                if entry.is_dir():
+                    pending.append((entry.path, dst_path))
+                else:
+                    files.append((entry.path, dst_path, entry.stat()))
+
+    no_reflink = threading.Event()
+    futures = [_copy_executor.submit(_copy_file, *file, no_reflink) for file in files]
+    try:
+        for future in as_completed(futures):
+            future.result()
+    finally:
+        # Don't leave copies running in the background after a failure
+        for future in futures:
+            future.cancel()
+
+def _fast_rmtree(path: str) -> None:
+    """Remove a directory tree, using ``rm -rf`` where available.
+    
+    coreutils rm is faster than shutil.rmtree on large trees such as
+    node_modules. Falls back to shutil.rmtree when disabled via FAST_DELETE
+    or when rm isn't available.
+    """
+    if configs.FAST_DELETE and os.name == "posix" and _RM_PATH:
+        subprocess.run([_RM_PATH, "-rf", "--", path], check=True, capture_output=True)
+    else:
+        shutil.rmtree(path)
+
 def create_project_directory(project_id):
     """Create a new project directory by copying files from user-app-template.
     
@@ -69,7 +363,7 @@ def create_project_directory(project_id):
     
     # Remove project directory if it exists
     if os.path.exists(project_path):
-        shutil.rmtree(project_path)
+        _fast_rmtree(project_path)
     
     # Ensure project directory exists
     os.makedirs(project_path, exist_ok=True)
@@ -94,54 +388,17 @@ def create_project_directory(project_id):
         logger.info(f"Copying template from {template_dir} to {project_path}")
         
         # Copy template to project directory
-        for item in os.listdir(template_dir):
-            src_path = os.path.join(template_dir, item)
-            dst_path = os.path.join(project_path, item)
-            
-            if os.path.isdir(src_path):
-                shutil.copytree(src_path, dst_path)
-            else:
-                shutil.copy2(src_path, dst_path)
+        _fast_copytree(template_dir, project_path)
         
-        # Initialize git repository
+        # Initialize the git repository and make the initial commit in one
+        # shell invocation. The user is stored in the repo config because
+        # later snapshot commits rely on it.
         logger.info(f"Initializing git repository in {project_path}")
         subprocess.run(
-            ["git", "init"],
-            cwd=project_path,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        # Add all files
-        subprocess.run(
-            ["git", "add", "."],
-            cwd=project_path,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        # Configure git user
-        subprocess.run(
-            ["git", "config", "user.name", "Initial commit"],
-            cwd=project_path,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        subprocess.run(
-            ["git", "config", "user.email", "system@example.com"],
-            cwd=project_path,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        # Make initial commit
-        subprocess.run(
-            ["git", "commit", "-m", "Initial project creation"],
+            [
+                "/bin/sh", "-c", _GIT_INIT_SCRIPT, "git-init",
+                "Initial commit", "system@example.com", "Initial project creation",
+            ],
             cwd=project_path,
             capture_output=True,
             text=True,
@@ -174,6 +431,23 @@ def _create_basic_project_structure(project_id, project_path):
     
     return project_path
 
+def _start_devhost(project_id: str) -> None:
+    """Ask devhost to start the dev server for a project, logging failures."""
+    try:
+        devhost_url = "http://devhost:5000/start"
+        # Increase timeout to 60 seconds to accommodate npm install
+        response = _devhost_session.post(
+            devhost_url,
+            json={"project_id": project_id},
+            timeout=60
+        )
+        if response.status_code != 200:
+            logger.warning(f"Devhost /start returned status {response.status_code}: {response.text}")
+        else:
+            logger.info(f"Devhost started for project {project_id}")
+    except Exception as e:
+        logger.warning(f"Could not start devhost for project {project_id}: {str(e)}")
+
 def create_project(data):
     """Create a new project with the given data.
     
@@ -215,19 +489,15 @@ def create_project(data):
                 index_path = os.path.join(project_path, "index.html")
                 if os.path.exists(index_path) and ai_title:
                     try:
-                        with open(index_path, 'r') as f:
-                            content = f.read()
-                            
-                        # Replace title if found
-                        import re
-                        new_content = re.sub(
-                            r'<title>([^<]+)</title>',
-                            f'<title>{ai_title} - Project {project_id}</title>',
-                            content
-                        )
+                        content = Path(index_path).read_bytes()
                         
-                        with open(index_path, 'w') as f:
-                            f.write(new_content)
+                        # Replace title if found; a function replacement keeps
+                        # backslashes in the title literal
+                        title = f'<title>{ai_title} - Project {project_id}</title>'.encode()
+                        new_content = _TITLE_RE.sub(lambda _: title, content, count=1)
+                        
+                        if new_content != content:
+                            Path(index_path).write_bytes(new_content)
                             
                         logger.info(f"Updated HTML title for project {project_id}")
                     except Exception as e:
@@ -244,27 +514,22 @@ def create_project(data):
             "updated_at": datetime.now().isoformat(),
             "path": project_path,
             "ai_title": ai_title,
-            "ai_description": ai_description
+            "ai_description": ai_description,
+            # create_project_directory falls back to a plain tree without git
+            "git_initialized": os.path.isdir(os.path.join(project_path, ".git"))
         }
         
         # Save project metadata
         save_project_metadata(project)
 
-        # Automatically start devhost for this project
-        try:
-            devhost_url = "http://devhost:5000/start"
-            # Increase timeout to 60 seconds to accommodate npm install
-            response = requests.post(
-                devhost_url,
-                json={"project_id": project_id},
-                timeout=60
-            )
-            if response.status_code != 200:
-                logger.warning(f"Devhost /start returned status {response.status_code}: {response.text}")
-            else:
-                logger.info(f"Devhost started for project {project_id}")
-        except Exception as e:
-            logger.warning(f"Could not start devhost for project {project_id}: {str(e)}")
+        # Automatically start devhost for this project, without waiting for
+        # it (npm install can take close to a minute)
+        threading.Thread(
+            target=_start_devhost,
+            args=(project_id,),
+            name=f"devhost-start-{project_id}",
+            daemon=True
+        ).start()
 
         return project, 201
         
@@ -279,18 +544,7 @@ def get_all_projects():
         tuple: (projects_list, status_code)
     """
     try:
-        projects_file = os.path.join(configs.WORKSPACE_PATH, "projects.json")
-        
-        if not os.path.exists(projects_file):
-            return [], 200
-            
-        with open(projects_file, 'r') as f:
-            try:
-                projects = json.load(f)
-            except json.JSONDecodeError:
-                projects = []
-                
-        return projects, 200
+        return _load_projects(), 200
         
     except Exception as e:
         logger.error(f"Error listing projects: {str(e)}")
@@ -305,22 +559,7 @@ def get_project_by_id(project_id):
     Returns:
         The project metadata or None if not found
     """
-    projects_file = os.path.join(configs.WORKSPACE_PATH, "projects.json")
-    
-    if not os.path.exists(projects_file):
-        return None
-        
-    with open(projects_file, 'r') as f:
-        try:
-            projects = json.load(f)
-        except json.JSONDecodeError:
-            projects = []
-    
-    for project in projects:
-        if project.get("id") == project_id:
-            return project
-            
-    return None
+    return _load_projects_index()[1].get(project_id)
 
 def delete_project(project_id):
     """Delete a project by its ID.
@@ -332,40 +571,23 @@ def delete_project(project_id):
         tuple: (response_data, status_code)
     """
     try:
-        # Get the projects list
-        projects_file = os.path.join(configs.WORKSPACE_PATH, "projects.json")
-        
-        if not os.path.exists(projects_file):
-            return {"error": "Project not found"}, 404
-            
-        # Load projects
-        with open(projects_file, 'r') as f:
-            try:
-                projects = json.load(f)
-            except json.JSONDecodeError:
-                projects = []
-        
-        # Find the project
-        project = None
-        for p in projects:
-            if p.get("id") == project_id:
-                project = p
-                break
-                
+        # Get the projects list and find the project
+        projects, projects_by_id = _load_projects_index()
+        project = projects_by_id.get(project_id)
         if not project:
             return {"error": "Project not found"}, 404
             
         # Delete the project directory
         project_path = project.get("path")
         if project_path and os.path.exists(project_path):
-            shutil.rmtree(project_path)
+            _fast_rmtree(project_path)
+        _project_root_prefix.cache_clear()
             
         # Remove project from projects list
         projects = [p for p in projects if p.get("id") != project_id]
         
         # Save updated projects list
-        with open(projects_file, 'w') as f:
-            json.dump(projects, f, indent=2)
+        _save_projects(projects)
             
         return {"message": f"Project {project_id} deleted successfully"}, 200
         
@@ -373,139 +595,252 @@ def delete_project(project_id):
         logger.error(f"Error deleting project: {str(e)}")
         return {"error": "Failed to delete project", "details": str(e)}, 500
 
-def create_project_zip(project_id: str) -> Tuple[str, str]:
-    """Create a zip file containing the project files.
-    
-    This function creates a zip archive of a project, excluding common
-    build artifacts, temporary files, and respecting any .gitignore patterns
-    in the project.
-    
-    Args:
-        project_id: The unique ID of the project
-        
-    Returns:
-        Tuple of (zip_file_path, zip_filename)
-        
+def _get_project_path_for_zip(project_id: str) -> str:
+    """Resolve a project's directory for archiving.
+
     Raises:
-        FileNotFoundError: If the project directory doesn't exist
-        Exception: For any other errors during zip creation
+        FileNotFoundError: If the project or its directory doesn't exist
     """
-    # Get project metadata
     project = get_project_by_id(project_id)
     if not project:
         raise FileNotFoundError(f"Project {project_id} not found")
-    
-    # Get project path
+
     project_path = project.get("path")
     if not project_path or not os.path.exists(project_path):
         raise FileNotFoundError(f"Project directory for {project_id} not found")
+
+    return project_path
+
+
+def _zip_entry_info(zipf: zipfile.ZipFile, rel_path: str, st: os.stat_result) -> zipfile.ZipInfo:
+    """Build the ZipInfo for a file, storing already-compressed formats as-is.
     
-    # Create temporary directory for the zip file
-    temp_dir = tempfile.mkdtemp()
-    zip_filename = f"project-{project_id}.zip"
-    zip_path = os.path.join(temp_dir, zip_filename)
+    Equivalent to ZipInfo.from_file, but uses the stat result the tree walk
+    already has instead of stat'ing the file again.
+    """
+    zinfo = zipfile.ZipInfo(rel_path.replace(os.sep, "/"), time.localtime(st.st_mtime)[:6])
+    zinfo.external_attr = (st.st_mode & 0xFFFF) << 16
+    zinfo.file_size = st.st_size
+    if os.path.splitext(rel_path)[1].lower() in _PRECOMPRESSED_EXTENSIONS:
+        zinfo.compress_type = zipfile.ZIP_STORED
+    else:
+        zinfo.compress_type = zipfile.ZIP_DEFLATED
+        # ZipFile.open() doesn't apply the archive's level; ZipFile.write()
+        # does it the same way
+        zinfo._compresslevel = zipf.compresslevel
+    return zinfo
+
+
+def _git_list_files(project_path: str) -> Optional[List[str]]:
+    """List a repository's tracked and untracked, non-ignored files.
     
+    Returns:
+        Paths relative to ``project_path``, or None if git can't list them
+    """
     try:
-        # Files and directories to exclude from the zip
-        exclude_patterns = [
-            "__pycache__",
-            "*.pyc",
-            "*.pyo",
-            ".git",
-            ".DS_Store",
-            "node_modules",
-            "venv",
-            "env",
-            ".env",
-            "dist",
-            "build",
-            "*.log"
-        ]
-        
-        # Load .gitignore patterns if available
-        gitignore_path = os.path.join(project_path, ".gitignore")
-        if os.path.exists(gitignore_path):
-            with open(gitignore_path, 'r') as f:
-                gitignore_patterns = [line.strip() for line in f.readlines() 
-                                     if line.strip() and not line.startswith('#')]
-                exclude_patterns.extend(gitignore_patterns)
-        
-        # Create the zip file
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, dirs, files in os.walk(project_path):
-                # Skip excluded directories
-                dirs[:] = [d for d in dirs if not _should_exclude(d, exclude_patterns)]
-                
-                # Process files
-                for file in files:
-                    # Skip excluded files
-                    if _should_exclude(file, exclude_patterns):
-                        continue
-                    
-                    # Get the full file path
-                    file_path = os.path.join(root, file)
-                    
-                    # Calculate the relative path within the zip
-                    rel_path = os.path.relpath(file_path, project_path)
-                    
-                    # Add the file to the zip
-                    zipf.write(file_path, rel_path)
-        
-        logger.info(f"Created zip archive for project {project_id} at {zip_path}")
-        return zip_path, zip_filename
+        result = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=project_path,
+            check=True,
+            capture_output=True
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.warning(f"git ls-files failed in {project_path}, walking instead: {str(e)}")
+        return None
+    return [os.fsdecode(path) for path in result.stdout.split(b"\0") if path]
+
+def _iter_zip_entries(project_path: str) -> Iterator[Tuple[str, str, os.stat_result]]:
+    """Yield (file_path, archive_path, stat) for every file to include in a project zip.
+
+    Common build artifacts and temporary files are skipped, as are files
+    ignored by the project's .gitignore. In a git repository the file list
+    comes from git itself, so ignore rules (nested files, negations, etc.)
+    behave exactly as in git; otherwise the tree is walked and the
+    top-level .gitignore patterns are matched by name. Each file is stat'ed
+    once, and the result is passed on for building its zip entry.
+    """
+    should_exclude = _compile_exclude_patterns(_ZIP_EXCLUDE_PATTERNS)
+
+    if os.path.isdir(os.path.join(project_path, ".git")):
+        rel_paths = _git_list_files(project_path)
+        if rel_paths is not None:
+            for rel_path in rel_paths:
+                if any(should_exclude(part) for part in rel_path.split("/")):
+                    continue
+                file_path = os.path.join(project_path, rel_path)
+                try:
+                    st = os.stat(file_path)
+                except (FileNotFoundError, NotADirectoryError):
+                    # Tracked file deleted from the working tree
+                    continue
+                if stat.S_ISREG(st.st_mode):
+                    yield file_path, rel_path, st
+            return
+
+    exclude_patterns = list(_ZIP_EXCLUDE_PATTERNS)
+
+    # Load .gitignore patterns if available
+    gitignore_path = os.path.join(project_path, ".gitignore")
+    if os.path.exists(gitignore_path):
+        with open(gitignore_path, 'r') as f:
+            gitignore_patterns = [line.strip() for line in f.readlines()
+                                 if line.strip() and not line.startswith('#')]
+            exclude_patterns.extend(gitignore_patterns)
+
+    should_exclude = _compile_exclude_patterns(exclude_patterns)
+
+    # Walk with os.scandir so file stats come from the directory entries
+    pending = [(project_path, "")]
+    while pending:
+        dir_path, rel_dir = pending.pop()
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                # Skip excluded files and directories
+                if should_exclude(entry.name):
+                    continue
+
+                if entry.is_dir():
+                    # Like os.walk, don't descend into symlinked directories
+                    if not entry.is_symlink():
+                        pending.append((entry.path, rel_dir + entry.name + os.sep))
+                    continue
+
+                yield entry.path, rel_dir + entry.name, entry.stat()
+
+
+class _ZipStreamBuffer(io.RawIOBase):
+    """Write-only, unseekable sink collecting zip output until it is drained."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+def _read_file_if_small(file_path: str, size: int) -> Optional[bytes]:
+    """Read a whole file for read-ahead, or return None if it is too large."""
+    if size > _ZIP_READ_AHEAD_MAX_FILE_SIZE:
+        return None
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+def _read_ahead(
+    entries: Iterator[Tuple[str, str, os.stat_result]],
+) -> Iterator[Tuple[str, str, os.stat_result, Optional[bytes]]]:
+    """Read upcoming zip entries on the copy pool while the current one is compressed.
     
-    except Exception as e:
-        # Clean up the temporary directory if there's an error
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
-        
-        logger.error(f"Error creating zip archive for project {project_id}: {str(e)}")
-        raise
+    Yields (file_path, archive_path, stat, data) in the original order.
+    ``data`` is None for files too large to buffer, which the caller reads
+    itself.
+    """
+    window = deque()
+    try:
+        for file_path, rel_path, st in entries:
+            future = _copy_executor.submit(_read_file_if_small, file_path, st.st_size)
+            window.append((file_path, rel_path, st, future))
+            if len(window) >= _ZIP_READ_AHEAD_FILES:
+                file_path, rel_path, st, future = window.popleft()
+                yield file_path, rel_path, st, future.result()
+        while window:
+            file_path, rel_path, st, future = window.popleft()
+            yield file_path, rel_path, st, future.result()
+    finally:
+        for *_, future in window:
+            future.cancel()
+
+def stream_project_zip(project_id: str) -> Tuple[Iterator[bytes], str]:
+    """Build a project zip on the fly, as an iterator of archive chunks.
+
+    Uses the project's exclusion rules (see _iter_zip_entries); nothing is
+    written to disk: the archive is produced in ~64 KB chunks as files are
+    compressed, so it can be sent straight to the client.
+
+    Args:
+        project_id: The unique ID of the project
+
+    Returns:
+        Tuple of (chunk_iterator, zip_filename)
+
+    Raises:
+        FileNotFoundError: If the project directory doesn't exist
+    """
+    project_path = _get_project_path_for_zip(project_id)
+    zip_filename = f"project-{project_id}.zip"
+
+    def generate() -> Iterator[bytes]:
+        buffer = _ZipStreamBuffer()
+        try:
+            with zipfile.ZipFile(
+                buffer, 'w', zipfile.ZIP_DEFLATED,
+                compresslevel=configs.ZIP_COMPRESS_LEVEL,
+            ) as zipf:
+                entries = _iter_zip_entries(project_path)
+                for file_path, rel_path, st, data in _read_ahead(entries):
+                    zinfo = _zip_entry_info(zipf, rel_path, st)
+                    with zipf.open(zinfo, 'w') as dest:
+                        if data is not None:
+                            for start in range(0, len(data), ZIP_STREAM_CHUNK_SIZE):
+                                dest.write(data[start:start + ZIP_STREAM_CHUNK_SIZE])
+                                if buffer.size >= ZIP_STREAM_CHUNK_SIZE:
+                                    yield buffer.drain()
+                        else:
+                            with open(file_path, 'rb') as src:
+                                while block := src.read(ZIP_STREAM_CHUNK_SIZE):
+                                    dest.write(block)
+                                    if buffer.size >= ZIP_STREAM_CHUNK_SIZE:
+                                        yield buffer.drain()
+                    if buffer.size >= ZIP_STREAM_CHUNK_SIZE:
+                        yield buffer.drain()
+            # Central directory, written when the archive is closed
+            yield buffer.drain()
+            logger.info(f"Streamed zip archive for project {project_id}")
+        except Exception as e:
+            logger.error(f"Error streaming zip archive for project {project_id}: {str(e)}")
+            raise
+
+    return generate(), zip_filename
 
-def _should_exclude(path, patterns):
-    """Check if a path should be excluded based on patterns.
+def _compile_exclude_patterns(patterns: List[str]) -> Callable[[str], bool]:
+    """Compile exclusion patterns into a single predicate.
+    
+    Patterns without glob characters are matched exactly; the rest are
+    translated with fnmatch and joined into one regex, so each check is a
+    set lookup plus at most one regex match.
     
     Args:
-        path: The path to check
         patterns: List of exclusion patterns
         
     Returns:
-        True if the path should be excluded, False otherwise
+        A function returning True if a name should be excluded
     """
-    # Simple pattern matching that supports basic glob patterns
-    for pattern in patterns:
-        # Exact match
-        if pattern == path:
-            return True
-        
-        # Glob wildcard
-        if '*' in pattern:
-            # Convert the glob pattern to a simple regex
-            import re
-            regex_pattern = pattern.replace('.', '\\.').replace('*', '.*')
-            if re.match(f"^{regex_pattern}$", path):
-                return True
+    exact = frozenset(p for p in patterns if not _GLOB_CHARS.intersection(p))
+    globs = [fnmatch.translate(p) for p in patterns if _GLOB_CHARS.intersection(p)]
+    if not globs:
+        return exact.__contains__
     
-    return False
-
-def cleanup_zip_file(zip_path):
-    """Clean up a temporary zip file.
+    match = re.compile("|".join(globs)).match
     
-    Args:
-        zip_path: Path to the zip file to delete
-    """
-    try:
-        if os.path.exists(zip_path):
-            os.remove(zip_path)
-            
-            # Also try to remove the parent directory if it's a temp dir
-            parent_dir = os.path.dirname(zip_path)
-            if os.path.exists(parent_dir) and tempfile.gettempdir() in parent_dir:
-                shutil.rmtree(parent_dir)
-                
-            logger.debug(f"Cleaned up temporary zip file: {zip_path}")
-    except Exception as e:
-        logger.error(f"Error cleaning up temporary zip file {zip_path}: {str(e)}")
+    # Names repeat a lot across a tree (index.ts, src, components, ...), so
+    # remember answers for the lifetime of this predicate
+    @functools.lru_cache(maxsize=4096)
+    def should_exclude(name: str) -> bool:
+        return name in exact or match(name) is not None
+    
+    return should_exclude
 
 def save_project_metadata(project):
     """Save project metadata to the projects.json file.
@@ -513,24 +848,13 @@ def save_project_metadata(project):
     Args:
         project: Project metadata to save
     """
-    projects_file = os.path.join(configs.WORKSPACE_PATH, "projects.json")
-    
     # Create projects.json if it doesn't exist
     if not os.path.exists(configs.WORKSPACE_PATH):
         os.makedirs(configs.WORKSPACE_PATH)
         
-    projects = []
-    if os.path.exists(projects_file):
-        with open(projects_file, 'r') as f:
-            try:
-                projects = json.load(f)
-            except json.JSONDecodeError:
-                projects = []
-    
-    projects.append(project)
-    
-    with open(projects_file, 'w') as f:
-        json.dump(projects, f, indent=2)
+    # The loaded list is shared with the cache, so extend a copy
+    projects = _load_projects() + [project]
+    _save_projects(projects)
 
 def clone_template(project_dir, template="default"):
     """Clone a template into the project directory.
@@ -558,14 +882,114 @@ def clone_template(project_dir, template="default"):
                 f.write("# Default Template\n\nThis is the default project template.\n")
     
     # Copy template contents to project directory
-    for item in os.listdir(template_path):
-        src_path = os.path.join(template_path, item)
-        dst_path = os.path.join(project_dir, item)
+    _fast_copytree(template_path, project_dir)
+
+def _format_git_date(timestamp: int, offset_minutes: int) -> str:
+    """Format a commit time like ``git log --date=iso``."""
+    tz = timezone(timedelta(minutes=offset_minutes))
+    return datetime.fromtimestamp(timestamp, tz).strftime("%Y-%m-%d %H:%M:%S %z")
+
+def _read_commit_history(project_path: str) -> List[Dict[str, str]]:
+    """List the commits reachable from HEAD, newest first.
+    
+    Reads the repository in-process with pygit2 when it is installed, and
+    falls back to parsing ``git log`` otherwise.
+    
+    Raises:
+        subprocess.CalledProcessError: If ``git log`` fails
+    """
+    if pygit2 is not None:
+        repo = pygit2.Repository(project_path)
+        if repo.head_is_unborn:
+            return []
+        commits = []
+        for commit in repo.walk(repo.head.target, pygit2.GIT_SORT_TIME):
+            # Same as git's %s: the first paragraph, joined onto one line
+            subject = " ".join(commit.message.strip().split("\n\n", 1)[0].split())
+            commits.append({
+                "hash": str(commit.id),
+                "title": subject,
+                "author": commit.author.name,
+                "date": _format_git_date(commit.author.time, commit.author.offset),
+            })
+        return commits
+    
+    # NUL between fields and RS after each commit, so subjects containing
+    # "|" or other punctuation can't break the parsing
+    result = subprocess.run(
+        ["git", "log", "--pretty=format:%H%x00%s%x00%an%x00%ad%x1e", "--date=iso"],
+        cwd=project_path,
+        check=True,
+        capture_output=True,
+        text=True
+    )
+    
+    # Parse the output
+    commits = []
+    for record in result.stdout.split('\x1e'):
+        parts = record.strip('\n').split('\x00')
+        if len(parts) == 4:
+            commits.append({
+                "hash": parts[0],
+                "title": parts[1],
+                "author": parts[2],
+                "date": parts[3]
+            })
+    return commits
+
+def _switch_commit_pygit2(project_id: str, project_path: str, commit_hash: str) -> Tuple[Dict[str, Any], int]:
+    """switch_project_commit using pygit2 instead of git subprocesses."""
+    repo = pygit2.Repository(project_path)
+    
+    # Validate commit hash exists
+    try:
+        commit = repo.revparse_single(commit_hash)
+    except (KeyError, ValueError, pygit2.GitError):
+        commit = None
+    if not isinstance(commit, pygit2.Commit):
+        logger.warning(f"Invalid commit hash {commit_hash} for project {project_id}")
+        return {"error": "Invalid commit hash"}, 400
+    
+    # Equivalent of git reset --hard followed by git checkout <commit>
+    try:
+        logger.info(f"Switching project {project_id} to commit {commit_hash}")
+        repo.checkout_tree(commit, strategy=pygit2.GIT_CHECKOUT_FORCE)
+        repo.set_head(commit.id)
+    except pygit2.GitError as e:
+        logger.error(f"Error switching to commit: {str(e)}")
+        return {"error": "Failed to switch to commit", "details": str(e)}, 500
+    
+    logger.info(f"Successfully switched project {project_id} to commit {commit_hash}")
+    return {
+        "success": True, 
+        "message": f"Successfully switched to commit {commit_hash}", 
+        "commit_hash": commit_hash
+    }, 200
+
+def _init_git_repository(project_id: str, project_path: str) -> Optional[Tuple[Dict[str, Any], int]]:
+    """Create a git repository with an initial commit in a project directory.
+    
+    Returns:
+        None on success, otherwise an (error response, status code) tuple
+    """
+    try:
+        logger.info(f"Initializing git repository for project {project_id}")
+        subprocess.run(
+            [
+                "/bin/sh", "-c", _GIT_INIT_SCRIPT, "git-init",
+                "Initial commit (template)", "system@example.com",
+                "Initial project creation",
+            ],
+            cwd=project_path,
+            check=True,
+            capture_output=True
+        )
         
-        if os.path.isdir(src_path):
-            shutil.copytree(src_path, dst_path, dirs_exist_ok=True)
-        else:
-            shutil.copy2(src_path, dst_path)
+        logger.info(f"Created initial commit for project {project_id}")
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Error initializing git repository: {e.stderr.decode()}")
+        return {"error": "Failed to initialize git repository", "details": e.stderr.decode()}, 500
+    return None
 
 def get_project_commit_history(project_id: str) -> Tuple[List[Dict[str, str]], int]:
     """Get the commit history of a project repository.
@@ -595,78 +1019,27 @@ def get_project_commit_history(project_id: str) -> Tuple[List[Dict[str, str]], i
             logger.warning(f"Project directory for {project_id} not found")
             return {"error": "Project directory not found"}, 404
             
-        # Check if project has a git repository
+        # Check if project has a git repository. Projects created with a repo
+        # are flagged in their metadata, so only older ones need the check.
         git_dir = os.path.join(project_path, ".git")
-        if not os.path.exists(git_dir):
-            # Initialize git repository if it doesn't exist
-            try:
-                logger.info(f"Initializing git repository for project {project_id}")
-                subprocess.run(
-                    ["git", "init"],
-                    cwd=project_path,
-                    check=True,
-                    capture_output=True
-                )
-                
-                # Add all files and make initial commit
-                subprocess.run(
-                    ["git", "add", "."],
-                    cwd=project_path,
-                    check=True,
-                    capture_output=True
-                )
-                
-                subprocess.run(
-                    ["git", "config", "user.name", "Initial commit (template)"],
-                    cwd=project_path,
-                    check=True,
-                    capture_output=True
-                )
-                
-                subprocess.run(
-                    ["git", "config", "user.email", "system@example.com"],
-                    cwd=project_path,
-                    check=True,
-                    capture_output=True
-                )
-                
-                subprocess.run(
-                    ["git", "commit", "-m", "Initial project creation"],
-                    cwd=project_path,
-                    check=True,
-                    capture_output=True
-                )
-                
-                logger.info(f"Created initial commit for project {project_id}")
-            except subprocess.CalledProcessError as e:
-                logger.error(f"Error initializing git repository: {e.stderr.decode()}")
-                return {"error": "Failed to initialize git repository", "details": e.stderr.decode()}, 500
+        if not project.get("git_initialized") and not os.path.exists(git_dir):
+            error = _init_git_repository(project_id, project_path)
+            if error:
+                return error
         
         # Get commit history
         try:
-            result = subprocess.run(
-                ["git", "log", "--pretty=format:%H|%s|%an|%ad", "--date=iso"],
-                cwd=project_path,
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            
-            # Parse the output
-            commits = []
-            for line in result.stdout.strip().split('\n'):
-                if not line:
-                    continue
-                    
-                parts = line.split('|')
-                if len(parts) >= 4:
-                    commit = {
-                        "hash": parts[0],
-                        "title": parts[1],
-                        "author": parts[2],
-                        "date": parts[3]
-                    }
-                    commits.append(commit)
+            try:
+                commits = _read_commit_history(project_path)
+            except Exception:
+                # A flagged project skipped the check above; re-initialise a
+                # repository that has been removed since
+                if not project.get("git_initialized") or os.path.exists(git_dir):
+                    raise
+                error = _init_git_repository(project_id, project_path)
+                if error:
+                    return error
+                commits = _read_commit_history(project_path)
             
             if not commits:
                 logger.info(f"No commit history found for project {project_id}")
@@ -712,6 +1085,9 @@ def switch_project_commit(project_id: str, commit_hash: str) -> Tuple[Dict[str,
             logger.warning(f"Project {project_id} does not have a git repository")
             return {"error": "Project does not have a git repository"}, 400
         
+        if pygit2 is not None:
+            return _switch_commit_pygit2(project_id, project_path, commit_hash)
+        
         # Validate commit hash exists
         try:
             # Check if commit hash exists in repository
@@ -768,6 +1144,15 @@ def switch_project_commit(project_id: str, commit_hash: str) -> Tuple[Dict[str,
         logger.error(f"Error switching project commit: {str(e)}")
         return {"error": "Failed to switch project commit", "details": str(e)}, 500 
 
+@functools.lru_cache(maxsize=1024)
+def _iso_mtime(mtime: float) -> str:
+    """Format a file mtime as a local ISO timestamp.
+    
+    Memoized because files written together (e.g. a copied template) share
+    their mtimes.
+    """
+    return datetime.fromtimestamp(mtime).isoformat()
+
 def get_project_files(project_id: str) -> Tuple[List[Dict[str, Any]], int]:
     """Get a list of all files in a project.
     
@@ -788,53 +1173,42 @@ def get_project_files(project_id: str) -> Tuple[List[Dict[str, Any]], int]:
         if not project_path or not os.path.exists(project_path):
             return {"error": f"Project directory for {project_id} not found"}, 404
         
-        # Directories that should be skipped
-        skipped_dirs = [
-            "node_modules",
-            "__pycache__",
-            ".mypy_cache",
-            ".pytest_cache",
-            ".git",
-            ".next",
-            "dist",
-            "build",
-            ".venv",
-            "venv",
-            ".env",
-            ".lovable",
-        ]
-        
         files = []
-        # Walk through the project directory
-        for root, dirs, filenames in os.walk(project_path):
-            # Skip hidden directories and directories in the skip list
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in skipped_dirs]
-            
-            for filename in filenames:
-                # Skip hidden files
-                if filename.startswith('.'):
-                    continue
+        # Hot callables bound once, rather than looked up for every entry
+        append = files.append
+        iso_mtime = _iso_mtime
+        skipped_dirs = _SKIPPED_PROJECT_DIRS
+        # Walk the project with os.scandir, reusing each entry's cached stat
+        pending = [(project_path, "")]
+        while pending:
+            dir_path, rel_dir = pending.pop()
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    # Skip hidden files and directories
+                    if entry.name.startswith('.'):
+                        continue
                     
-                full_path = os.path.join(root, filename)
-                rel_path = os.path.relpath(full_path, project_path)
-                
-                # Skip files in skipped directories (for nested paths)
-                if any(skip_dir in rel_path.split(os.sep) for skip_dir in skipped_dirs):
-                    continue
-                
-                # Get file stats
-                file_stat = os.stat(full_path)
-                
-                files.append({
-                    "name": filename,
-                    "path": rel_path,
-                    "size": file_stat.st_size,
-                    "modified": datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
-                    "is_directory": False
-                })
+                    name = entry.name
+                    rel_path = rel_dir + name
+                    if entry.is_dir():
+                        # Like os.walk, don't descend into symlinked directories
+                        if name not in skipped_dirs and not entry.is_symlink():
+                            pending.append((entry.path, rel_path + os.sep))
+                        continue
+                    
+                    # Get file stats
+                    file_stat = entry.stat()
+                    
+                    append({
+                        "name": name,
+                        "path": rel_path,
+                        "size": file_stat.st_size,
+                        "modified": iso_mtime(file_stat.st_mtime),
+                        "is_directory": False
+                    })
         
         # Sort files by path
-        files.sort(key=lambda x: x["path"])
+        files.sort(key=itemgetter("path"))
         
         return files, 200
         
@@ -842,66 +1216,200 @@ def get_project_files(project_id: str) -> Tuple[List[Dict[str, Any]], int]:
         logger.error(f"Error getting files for project {project_id}: {str(e)}")
         return {"error": f"Failed to get project files: {str(e)}"}, 500
 
-def get_file_content(project_id: str, file_path: str) -> Tuple[Dict[str, Any], int]:
-    """Get the content of a specific file in a project.
+@functools.lru_cache(maxsize=10000)
+def _project_root_prefix(project_path: str) -> str:
+    """Resolve a project directory's real path, with a trailing separator.
+    
+    Cached across requests, so file paths can be joined onto it with a plain
+    string concatenation. Cleared by delete_project, the only place a
+    project directory goes away.
+    """
+    return os.path.join(os.path.realpath(project_path), '')
+
+def _fd_path(fd: int, path: str) -> str:
+    """Return the real path of an open file.
+    
+    Reads the /proc/self/fd link (one syscall) where available, and falls
+    back to resolving ``path`` with os.path.realpath.
+    """
+    try:
+        return os.readlink(f"/proc/self/fd/{fd}")
+    except OSError:
+        return os.path.realpath(path)
+
+def _read_text(fd: int, size: int) -> str:
+    """Read a UTF-8 file from a descriptor, as text mode would.
+    
+    Large files are decoded straight from a read-only memory map instead of
+    being copied into a bytes object first.
+    
+    Raises:
+        UnicodeDecodeError: If the file is not valid UTF-8
+    """
+    if size >= _MMAP_MIN_SIZE:
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            text = str(mm, 'utf-8')
+    else:
+        # One allocation sized from fstat, read with a single syscall in the
+        # common case, rather than a buffered readall()
+        data = os.read(fd, size)
+        while len(data) < size:
+            chunk = os.read(fd, size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        text = data.decode('utf-8')
+    
+    # Universal newlines, like open(..., 'r')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+def _open_project_file(project_id: str, file_path: str) -> Tuple[Optional[int], Any, int]:
+    """Open a regular file inside a project for reading.
     
     Args:
         project_id: The unique ID of the project
         file_path: Relative path to the file within the project
         
     Returns:
-        tuple: (response with file content, status_code)
+        tuple: (fd, file stat, 200) on success, or (None, error response,
+        status_code). The caller owns and must close the descriptor.
     """
-    try:
-        # Get project info
-        project = get_project_by_id(project_id)
-        if not project:
-            return {"error": f"Project {project_id} not found"}, 404
-            
-        # Get project path
-        project_path = project.get("path")
-        if not project_path or not os.path.exists(project_path):
-            return {"error": f"Project directory for {project_id} not found"}, 404
-        
-        # Build absolute file path
-        absolute_file_path = os.path.join(project_path, file_path)
+    # Get project info
+    project = get_project_by_id(project_id)
+    if not project:
+        return None, {"error": f"Project {project_id} not found"}, 404
         
-        # Normalize paths to avoid directory traversal attacks
-        absolute_file_path = os.path.normpath(absolute_file_path)
-        project_path = os.path.normpath(project_path)
+    # Get project path
+    # Whether the directory exists is only checked if the open fails
+    project_path = project.get("path")
+    if not project_path:
+        return None, {"error": f"Project directory for {project_id} not found"}, 404
+    
+    # Reject paths that lexically leave the project directory, to
+    # prevent directory traversal
+    rel_path = os.path.normpath(file_path)
+    if os.path.isabs(rel_path) or rel_path == os.pardir or rel_path.startswith(os.pardir + os.sep):
+        return None, {"error": "Invalid file path"}, 400
+    root_prefix = _project_root_prefix(project_path)
+    absolute_file_path = root_prefix + rel_path
+    
+    # Open once and take the metadata from the descriptor, rather than
+    # stat'ing the path separately for existence, type and size.
+    # O_NONBLOCK keeps a FIFO from blocking the open.
+    try:
+        fd = os.open(absolute_file_path, os.O_RDONLY | os.O_CLOEXEC | os.O_NONBLOCK | os.O_NOCTTY)
+    except (FileNotFoundError, NotADirectoryError):
+        if not os.path.isdir(project_path):
+            return None, {"error": f"Project directory for {project_id} not found"}, 404
+        return None, {"error": f"File {file_path} not found"}, 404
+    
+    try:
+        # Symlinks may still point outside the project; check where the open
+        # actually landed. Matching against the prefix with its trailing
+        # separator compares whole components, so /proj doesn't contain /proj2.
+        opened_path = _fd_path(fd, absolute_file_path)
+        if not (opened_path + os.sep).startswith(root_prefix):
+            os.close(fd)
+            return None, {"error": "Invalid file path"}, 400
         
-        # Check if file path is within project directory to prevent directory traversal
-        if not absolute_file_path.startswith(project_path):
-            return {"error": "Invalid file path"}, 400
+        file_stat = os.fstat(fd)
         
-        # Check if file exists
-        if not os.path.exists(absolute_file_path):
-            return {"error": f"File {file_path} not found"}, 404
-            
         # Check if path is a file and not a directory
-        if not os.path.isfile(absolute_file_path):
-            return {"error": f"Path {file_path} is a directory, not a file"}, 400
+        if not stat.S_ISREG(file_stat.st_mode):
+            os.close(fd)
+            return None, {"error": f"Path {file_path} is a directory, not a file"}, 400
+    except BaseException:
+        os.close(fd)
+        raise
+    
+    return fd, file_stat, 200
+
+def get_file_content(project_id: str, file_path: str) -> Tuple[Dict[str, Any], int]:
+    """Get the content of a specific file in a project.
+    
+    Args:
+        project_id: The unique ID of the project
+        file_path: Relative path to the file within the project
+        
+    Returns:
+        tuple: (response with file content, status_code)
+    """
+    try:
+        fd, file_stat, status_code = _open_project_file(project_id, file_path)
+        if fd is None:
+            return file_stat, status_code
         
         # Read file content
         try:
-            with open(absolute_file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = _read_text(fd, file_stat.st_size)
         except UnicodeDecodeError:
             # If the file is not a text file, return an error
             return {"error": f"File {file_path} is not a text file"}, 400
-            
-        # Get file metadata
-        file_stat = os.stat(absolute_file_path)
+        finally:
+            os.close(fd)
         
         # Return file content and metadata
         return {
             "name": os.path.basename(file_path),
             "path": file_path,
             "size": file_stat.st_size,
-            "modified": datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
+            "modified": _iso_mtime(file_stat.st_mtime),
             "content": content
         }, 200
         
     except Exception as e:
         logger.error(f"Error getting file content for {file_path} in project {project_id}: {str(e)}")
-        return {"error": f"Failed to get file content: {str(e)}"}, 500 
\ No newline at end of file
+        return {"error": f"Failed to get file content: {str(e)}"}, 500
+
+def get_file_metadata(project_id: str, file_path: str) -> Tuple[Dict[str, Any], int]:
+    """Get a project file's size and modification time without reading it.
+    
+    Args:
+        project_id: The unique ID of the project
+        file_path: Relative path to the file within the project
+        
+    Returns:
+        tuple: (response with file metadata, status_code)
+    """
+    try:
+        fd, file_stat, status_code = _open_project_file(project_id, file_path)
+        if fd is None:
+            return file_stat, status_code
+        os.close(fd)
+        
+        return {
+            "name": os.path.basename(file_path),
+            "path": file_path,
+            "size": file_stat.st_size,
+            "modified": _iso_mtime(file_stat.st_mtime)
+        }, 200
+        
+    except Exception as e:
+        logger.error(f"Error getting file metadata for {file_path} in project {project_id}: {str(e)}")
+        return {"error": f"Failed to get file metadata: {str(e)}"}, 500
+
+def open_project_file(project_id: str, file_path: str) -> Tuple[Any, int]:
+    """Open a project file for sending its raw bytes.
+    
+    Unlike get_file_content, the file is not read or decoded, so it can be
+    passed to flask.send_file and sent with sendfile(2).
+    
+    Args:
+        project_id: The unique ID of the project
+        file_path: Relative path to the file within the project
+        
+    Returns:
+        tuple: (binary file object, 200) or (error response, status_code).
+        The caller owns and must close the file.
+    """
+    try:
+        fd, result, status_code = _open_project_file(project_id, file_path)
+        if fd is None:
+            return result, status_code
+        return os.fdopen(fd, 'rb'), 200
+        
+    except Exception as e:
+        logger.error(f"Error opening {file_path} in project {project_id}: {str(e)}")
+        return {"error": f"Failed to open file: {str(e)}"}, 500
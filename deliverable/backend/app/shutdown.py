@@ -0,0 +1,34 @@
+"""Process shutdown signalling.
+
+Long-lived responses (SSE streams) check ``shutting_down`` so a worker can
+drain quickly on SIGTERM instead of waiting for every agent run to finish.
+"""
+
+import signal
+import threading
+
+shutting_down = threading.Event()
+
+
+def install_signal_handlers() -> None:
+    """Set ``shutting_down`` on SIGTERM/SIGINT, then run the previous handler.
+
+    The previous handler (e.g. gunicorn's graceful exit) is chained, not
+    replaced. Signal handlers can only be installed from the main thread, so
+    this is a no-op anywhere else.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        previous = signal.getsignal(signum)
+
+        def handler(signum, frame, previous=previous):
+            shutting_down.set()
+            if callable(previous):
+                previous(signum, frame)
+            elif previous == signal.SIG_DFL:
+                signal.signal(signum, signal.SIG_DFL)
+                signal.raise_signal(signum)
+
+        signal.signal(signum, handler)
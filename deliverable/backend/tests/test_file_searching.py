@@ -0,0 +1,23 @@
+"""File search tests."""
+import asyncio
+
+import pytest
+
+from app.agentic.utils import file_searching
+from app.agentic.utils.file_searching import search_files
+
+TEXT = "foo one\nbar\nfoo two\n"
+
+@pytest.mark.parametrize("regex", [r"\Afoo", r"(?<!\n)foo", r"^foo", r"foo"])
+def test_small_and_large_files_match_alike(tmp_path, monkeypatch, regex):
+    """Buffer and line-by-line search report the same lines for any pattern."""
+    (tmp_path / "a.txt").write_text(TEXT)
+
+    small, small_total = asyncio.run(search_files(tmp_path, regex))
+    # Force the line-by-line path used for large files
+    monkeypatch.setattr(file_searching, "WHOLE_FILE_SEARCH_LIMIT", -1)
+    large, large_total = asyncio.run(search_files(tmp_path, regex))
+
+    assert small == large
+    assert small_total == large_total == 2
+    assert [m["line_num"] for m in small["a.txt"]] == [1, 3]
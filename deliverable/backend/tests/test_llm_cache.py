@@ -0,0 +1,21 @@
+"""LLM result cache tests."""
+import asyncio
+
+from app.agentic.utils.llm_cache import Uncached, llm_cache
+
+
+def test_fallback_results_are_not_cached():
+    """A fallback wrapped in Uncached is returned but asked for again next time."""
+    replies = iter([Uncached("fallback"), "parsed", "unused"])
+    calls = []
+
+    @llm_cache()
+    async def generate(text):
+        calls.append(text)
+        return next(replies)
+
+    async def run():
+        return [await generate("msg") for _ in range(3)]
+
+    assert asyncio.run(run()) == ["fallback", "parsed", "parsed"]
+    assert calls == ["msg", "msg"]
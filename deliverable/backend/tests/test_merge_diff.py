@@ -0,0 +1,41 @@
+"""Deterministic unified diff application tests."""
+from app.agentic.utils.merge_diff import apply_unified_diff
+
+DUPLICATED = (
+    "def a():\n"
+    "    x = 1\n"
+    "    return x\n"
+    "\n"
+    "def b():\n"
+    "    x = 1\n"
+    "    return x\n"
+)
+
+def test_offset_header_patches_nearest_block():
+    """A header that is off by a line still patches the block it points at."""
+    # The block really starts at line 6; the identical one in a() must stay
+    diff = (
+        "@@ -7,2 +7,2 @@\n"
+        "     x = 1\n"
+        "-    return x\n"
+        "+    return x + 1\n"
+    )
+    result = apply_unified_diff(DUPLICATED, diff)
+    assert result == DUPLICATED.replace(
+        "def b():\n    x = 1\n    return x\n",
+        "def b():\n    x = 1\n    return x + 1\n",
+    )
+
+def test_equidistant_duplicate_blocks_are_ambiguous():
+    """Two matches equally far from the header fall back to the LLM merge."""
+    original = "x\nmid\nx\n"
+    diff = "@@ -2 +2 @@\n-x\n+y\n"
+    assert apply_unified_diff(original, diff) is None
+
+def test_crlf_line_endings_are_preserved():
+    """CRLF files keep CRLF, including on added lines."""
+    assert apply_unified_diff("a\r\nb\r\n", "@@ -1 +1 @@\n-a\n+c\n") == "c\r\nb\r\n"
+
+def test_form_feed_is_not_a_line_break():
+    """Only newlines split lines."""
+    assert apply_unified_diff("a\x0cb\nc\n", "@@ -2 +2 @@\n-c\n+d\n") == "a\x0cb\nd\n"
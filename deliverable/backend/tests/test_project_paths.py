@@ -0,0 +1,15 @@
+"""Project route discovery tests."""
+import asyncio
+
+from app.agentic.utils.project_paths import find_project_paths
+
+
+def test_new_router_file_in_visited_directory_invalidates_cache(tmp_path):
+    """A router file added next to non-router files is picked up."""
+    (tmp_path / "src" / "pages").mkdir(parents=True)
+    (tmp_path / "src" / "pages" / "Home.tsx").write_text("export default 1\n")
+    (tmp_path / "src" / "App.tsx").write_text('<Route path="/a" />\n')
+    assert asyncio.run(find_project_paths(tmp_path)) == ["/", "/a"]
+
+    (tmp_path / "src" / "pages" / "routes.tsx").write_text('<Route path="/b" />\n')
+    assert asyncio.run(find_project_paths(tmp_path)) == ["/", "/a", "/b"]
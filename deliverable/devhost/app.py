@@ -7,7 +7,6 @@ import threading
 import logging
 import atexit
 import subprocess
-import time
 import tempfile
 from waitress import serve
 from utils import (
@@ -16,6 +15,11 @@ from utils import (
     server_lock, 
     stop_running_server,
     is_port_in_use,
+    wait_for_port_free,
+    dependency_hash,
+    dependencies_installed,
+    mark_dependencies_installed,
+    run_npm_install,
     cleanup as utils_cleanup
 )
 
@@ -33,6 +37,35 @@ CONTROL_PORT = int(os.environ.get('CONTROL_PORT', 5000))
 # Starting port for the proxy (npm dev servers)
 PROXY_PORT = int(os.environ.get('PROXY_PORT', 3035))
 
+# Files written into each project to pin Vite to PROXY_PORT. The port is
+# fixed for the process, so the contents are rendered once at import time.
+ENV_LOCAL_CONTENT = (
+    f"VITE_FORCE_PORT={PROXY_PORT}\n"
+    "VITE_DISABLE_PORT_FALLBACK=true\n"
+).encode()
+VITE_CONFIG_OVERRIDE_CONTENT = f"""
+import {{ defineConfig }} from 'vite';
+
+// This is an override configuration to force Vite to use a specific port
+export default defineConfig({{
+  server: {{
+    port: {PROXY_PORT},
+    strictPort: true, // This forces Vite to fail if the port is not available
+    host: '0.0.0.0'
+  }}
+}});
+""".encode()
+
+def write_file(path, data):
+    """Write bytes to a file directly through its descriptor"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
 # Server state
 running_process_id = None
 running_project_id = None
@@ -75,29 +108,30 @@ def start_server():
         return jsonify({"error": f"Project directory not found: {full_project_path}"}), 404
     
     try:
-        # First, run npm install to ensure dependencies are available
-        logger.info(f"Running npm install in {full_project_path}")
-        npm_install_process = subprocess.run(
-            ["npm", "install", "--legacy-peer-deps"],
-            cwd=full_project_path,
-            capture_output=True,
-            text=True
-        )
-        
-        if npm_install_process.returncode != 0:
-            error_msg = npm_install_process.stderr
-            logger.error(f"npm install failed: {error_msg}")
-            return jsonify({"error": f"npm install failed: {error_msg}"}), 500
-        
-        logger.info("npm install completed successfully")
+        # First, run npm install to ensure dependencies are available,
+        # unless node_modules was installed from the same package files
+        if dependencies_installed(full_project_path, dependency_hash(full_project_path)):
+            logger.info(f"Dependencies unchanged, skipping npm install in {full_project_path}")
+        else:
+            logger.info(f"Running npm install in {full_project_path}")
+            npm_install_process = run_npm_install(
+                full_project_path, ["--legacy-peer-deps"]
+            )
+            
+            if npm_install_process.returncode != 0:
+                error_msg = npm_install_process.stderr
+                logger.error(f"npm install failed: {error_msg}")
+                return jsonify({"error": f"npm install failed: {error_msg}"}), 500
+            
+            # Hashed after the install, which may have rewritten the lockfile
+            mark_dependencies_installed(full_project_path)
+            logger.info("npm install completed successfully")
         
         # Create a temporary .env file to force Vite to use the specified port
         # This prevents Vite from automatically switching to a different port
         env_file_path = os.path.join(full_project_path, '.env.local')
         try:
-            with open(env_file_path, 'w') as f:
-                f.write(f"VITE_FORCE_PORT={PROXY_PORT}\n")
-                f.write("VITE_DISABLE_PORT_FALLBACK=true\n")
+            write_file(env_file_path, ENV_LOCAL_CONTENT)
             logger.info(f"Created temporary .env.local file to force port {PROXY_PORT}")
         except Exception as e:
             logger.warning(f"Could not create .env.local file: {str(e)}")
@@ -105,26 +139,17 @@ def start_server():
         # Create a vite.config.override.js file to force the port
         vite_config_override = os.path.join(full_project_path, 'vite.config.override.js')
         try:
-            with open(vite_config_override, 'w') as f:
-                f.write("""
-import { defineConfig } from 'vite';
-
-// This is an override configuration to force Vite to use a specific port
-export default defineConfig({
-  server: {
-    port: PROXY_PORT_PLACEHOLDER,
-    strictPort: true, // This forces Vite to fail if the port is not available
-    host: '0.0.0.0'
-  }
-});
-                """.replace('PROXY_PORT_PLACEHOLDER', str(PROXY_PORT)))
+            write_file(vite_config_override, VITE_CONFIG_OVERRIDE_CONTENT)
             logger.info(f"Created vite.config.override.js to force port {PROXY_PORT}")
         except Exception as e:
             logger.warning(f"Could not create vite.config.override.js: {str(e)}")
         
         # Ensure port is available with more aggressive cleanup just before starting
         stop_running_server()
-        time.sleep(2)  # Short wait to ensure port is released
+        bind_error = wait_for_port_free(PROXY_PORT)
+        if bind_error:
+            logger.error(f"Port {PROXY_PORT} was not released: {bind_error}")
+            return jsonify({"error": f"Port {PROXY_PORT} is still in use and could not be freed: {bind_error}"}), 500
         
         # Start the development server with explicit port and host flags
         # Use --force to ensure Vite doesn't try to be "smart" about port selection
@@ -1,3 +1,4 @@
+import hashlib
 import os
 import signal
 import subprocess
@@ -8,6 +9,8 @@ import logging
 import threading
 import socket
 import platform
+import select
+import selectors
 import sys
 
 # Configure logging
@@ -47,15 +50,97 @@ def list_directory_contents(directory):
     """List all contents of a directory recursively"""
     result = []
     try:
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                result.append(os.path.join(root, file))
-            for dir in dirs:
-                result.append(os.path.join(root, dir) + '/')
+        # Walk with an explicit os.scandir stack; entries classify themselves
+        # from the directory listing without a stat each
+        stack = [directory]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            result.append(entry.path + '/')
+                            # Like os.walk, don't descend into symlinked directories
+                            if not entry.is_symlink():
+                                stack.append(entry.path)
+                        else:
+                            result.append(entry.path)
+            except OSError:
+                # Unreadable or vanished directory; os.walk skipped these too
+                continue
     except Exception as e:
         logger.error(f"Error listing directory contents: {str(e)}")
     return result
 
+# Files whose contents decide what `npm install` produces
+DEPENDENCY_FILES = ('package.json', 'package-lock.json')
+# Written into node_modules after a successful install
+INSTALL_STAMP = os.path.join('node_modules', '.install.stamp')
+
+def dependency_hash(project_path):
+    """Hash the project's package manifest and lockfile"""
+    digest = hashlib.blake2b(digest_size=16)
+    for name in DEPENDENCY_FILES:
+        digest.update(name.encode() + b'\0')
+        try:
+            with open(os.path.join(project_path, name), 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 16), b''):
+                    digest.update(chunk)
+        except FileNotFoundError:
+            digest.update(b'missing')
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def dependencies_installed(project_path, deps_hash):
+    """Check whether node_modules was installed from the current dependency files"""
+    try:
+        with open(os.path.join(project_path, INSTALL_STAMP)) as f:
+            return f.read().strip() == deps_hash
+    except OSError:
+        return False
+
+def mark_dependencies_installed(project_path):
+    """Record the dependency files node_modules was installed from"""
+    try:
+        with open(os.path.join(project_path, INSTALL_STAMP), 'w') as f:
+            f.write(dependency_hash(project_path))
+    except OSError as e:
+        logger.warning(f"Could not write npm install stamp: {str(e)}")
+
+# Shared by every npm install: reuse the npm cache without revalidating it,
+# which is most of a warm install; skip the audit and funding requests and
+# the progress bar nobody sees
+NPM_OFFLINE_FLAGS = ["--prefer-offline", "--no-audit", "--no-fund", "--no-progress"]
+# Environment for npm installs, without the update-notifier check
+NPM_ENV = {**os.environ, "NPM_CONFIG_UPDATE_NOTIFIER": "false"}
+
+def run_npm_install(project_path, extra_flags=()):
+    """Install a project's dependencies, returning the finished process.
+    
+    With a lockfile, `npm ci` installs it as-is without resolving the tree.
+    It refuses a lockfile out of sync with package.json, which happens
+    whenever a dependency is added to package.json, so on failure the
+    install is retried with `npm install`, which updates the lockfile.
+    stdout is discarded; stderr is captured as text.
+    """
+    flags = list(extra_flags) + NPM_OFFLINE_FLAGS
+    
+    def run(subcommand):
+        return subprocess.run(
+            ["npm", subcommand] + flags,
+            cwd=project_path,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            env=NPM_ENV
+        )
+    
+    if os.path.exists(os.path.join(project_path, 'package-lock.json')):
+        result = run("ci")
+        if result.returncode == 0:
+            return result
+        logger.warning(f"npm ci failed, retrying with npm install: {result.stderr}")
+    return run("install")
+
 def run_dev_server(project_id, workspace_dir):
     """Run npm install and npm run dev for a project"""
     project_path = os.path.join(workspace_dir, project_id)
@@ -64,16 +149,17 @@ def run_dev_server(project_id, workspace_dir):
         logger.error(f"Project path does not exist: {project_path}")
         return False, "Project directory not found"
     
-    # Change to project directory
-    os.chdir(project_path)
-    
-    # Run npm install
-    logger.info(f"Running npm install for project {project_id}")
-    try:
-        subprocess.run(["npm", "install"], check=True, capture_output=True)
-    except subprocess.CalledProcessError as e:
-        logger.error(f"npm install failed: {e.stderr.decode()}")
-        return False, f"npm install failed: {e.stderr.decode()}"
+    # Run npm install, unless node_modules was installed from the same
+    # package files
+    if dependencies_installed(project_path, dependency_hash(project_path)):
+        logger.info(f"Dependencies unchanged, skipping npm install for project {project_id}")
+    else:
+        logger.info(f"Running npm install for project {project_id}")
+        result = run_npm_install(project_path)
+        if result.returncode != 0:
+            logger.error(f"npm install failed: {result.stderr}")
+            return False, f"npm install failed: {result.stderr}"
+        mark_dependencies_installed(project_path)
     
     # Run npm run dev
     logger.info(f"Starting dev server for project {project_id}")
@@ -85,6 +171,7 @@ def run_dev_server(project_id, workspace_dir):
         
         process = subprocess.Popen(
             ["npm", "run", "dev"], 
+            cwd=project_path,
             env=env,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
@@ -107,9 +194,40 @@ def run_dev_server(project_id, workspace_dir):
         logger.error(f"Failed to start dev server: {str(e)}")
         return False, f"Failed to start dev server: {str(e)}"
 
+def iter_process_lines(process):
+    """Yield (stream name, line) from a process's stdout and stderr as they arrive.
+    
+    Both pipes are multiplexed with a selector in the calling thread, so a
+    chatty stderr can't fill up and block the child while stdout is read.
+    """
+    selector = selectors.DefaultSelector()
+    pending = {}
+    for name, stream in (('stdout', process.stdout), ('stderr', process.stderr)):
+        if stream is not None:
+            selector.register(stream.fileno(), selectors.EVENT_READ, name)
+            pending[name] = b''
+    try:
+        while selector.get_map():
+            for key, _ in selector.select():
+                name = key.data
+                chunk = os.read(key.fd, 65536)
+                if not chunk:
+                    selector.unregister(key.fd)
+                    if pending[name]:
+                        yield name, pending[name].decode(errors='replace')
+                    continue
+                *lines, pending[name] = (pending[name] + chunk).split(b'\n')
+                for line in lines:
+                    yield name, line.decode(errors='replace')
+    finally:
+        selector.close()
+
 def monitor_output(project_id, process):
     """Monitor the output of the dev server process"""
-    for line in iter(process.stdout.readline, ''):
+    for name, line in iter_process_lines(process):
+        if name == 'stderr':
+            logger.error(f"[{project_id}] {line.strip()}")
+            continue
         logger.info(f"[{project_id}] {line.strip()}")
         
         # Look for a message indicating the server is ready
@@ -124,82 +242,307 @@ def monitor_output(project_id, process):
 
 def log_output(process, project_id):
     """Log the output and error streams from a process"""
-    for line in iter(process.stdout.readline, ''):
-        logger.info(f"[{project_id}] {line.strip()}")
-    for line in iter(process.stderr.readline, ''):
-        logger.error(f"[{project_id}] {line.strip()}")
+    for name, line in iter_process_lines(process):
+        if name == 'stderr':
+            logger.error(f"[{project_id}] {line.strip()}")
+        else:
+            logger.info(f"[{project_id}] {line.strip()}")
+
+# Seconds before a hung lsof is abandoned
+LSOF_TIMEOUT = 2
+
+def _lsof_pids(port):
+    """List the PIDs lsof reports for a port.
+    
+    -n and -P skip host and port name lookups, which can otherwise stall on
+    DNS.
+    """
+    result = subprocess.run(
+        ["lsof", "-nP", "-i", f":{port}", "-t"],
+        capture_output=True,
+        text=True,
+        timeout=LSOF_TIMEOUT
+    )
+    return [int(pid) for pid in result.stdout.split()]
+
+# TCP socket tables; their rows carry the local address and socket inode
+PROC_NET_TCP_FILES = ('/proc/net/tcp', '/proc/net/tcp6')
+# Socket state column value for LISTEN
+TCP_LISTEN = '0A'
+
+def _socket_inodes_for_port(port):
+    """Return inodes of TCP sockets bound to a local port, listeners first.
+    
+    Raises OSError if the socket tables can't be read.
+    """
+    listening, other = [], []
+    for table in PROC_NET_TCP_FILES:
+        try:
+            with open(table) as f:
+                rows = f.read().splitlines()[1:]
+        except FileNotFoundError:
+            # No IPv6 on this host
+            continue
+        for row in rows:
+            fields = row.split()
+            # fields: sl, local_address, rem_address, st, ..., inode (index 9)
+            if int(fields[1].rsplit(':', 1)[1], 16) != port or fields[9] == '0':
+                continue
+            (listening if fields[3] == TCP_LISTEN else other).append(fields[9])
+    return listening + other
 
-def find_process_using_port(port):
+def _pids_by_port_linux(port, first_listener=False):
+    """Find the PIDs owning sockets on a port from /proc, without psutil.
+    
+    Reads the TCP tables once, then looks for the socket inodes among the
+    processes' open file descriptors. PIDs owning listening sockets come
+    first. With first_listener, the scan stops at the first listener's owner.
+    Raises OSError if /proc/net can't be read.
+    """
+    inodes = _socket_inodes_for_port(port)
+    if not inodes:
+        return []
+    targets = {f"socket:[{inode}]": rank for rank, inode in enumerate(inodes)}
+    
+    # pid -> best (lowest) rank among its sockets
+    owners = {}
+    with os.scandir('/proc') as procs:
+        for entry in procs:
+            if not entry.name.isdigit():
+                continue
+            try:
+                with os.scandir(f"/proc/{entry.name}/fd") as fds:
+                    for fd in fds:
+                        try:
+                            rank = targets.get(os.readlink(fd.path))
+                        except OSError:
+                            continue
+                        if rank is not None:
+                            pid = int(entry.name)
+                            owners[pid] = min(rank, owners.get(pid, rank))
+            except OSError:
+                # Process exited or its fds aren't readable
+                continue
+            if first_listener and owners.get(int(entry.name)) == 0:
+                break
+    return sorted(owners, key=owners.get)
+
+def _pids_by_port(port):
+    """List the PIDs with sockets on a port, from /proc on Linux or lsof elsewhere"""
+    if platform.system() == "Linux":
+        try:
+            return _pids_by_port_linux(port)
+        except OSError as e:
+            logger.warning(f"Could not read /proc socket tables: {str(e)}")
+    return _lsof_pids(port)
+
+def kill_all_pids_on_port(port):
+    """SIGKILL every process with a socket on a port, without spawning a shell"""
+    killed = False
+    for pid in _pids_by_port(port):
+        try:
+            os.kill(pid, signal.SIGKILL)
+            logger.info(f"Sent SIGKILL to process {pid} using port {port}")
+            killed = True
+        except ProcessLookupError:
+            pass
+    return killed
+
+def _snapshot_processes_linux():
+    """Read every process's cmdline straight from /proc.
+    
+    os.scandir lists /proc without a stat per entry, and only the cmdline
+    file is read for each process. It's kept as the raw NUL-separated bytes
+    and only decoded if it matches something.
+    """
+    processes = []
+    with os.scandir('/proc') as procs:
+        for entry in procs:
+            if not entry.name.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry.name}/cmdline", 'rb') as f:
+                    raw = f.read()
+            except OSError:
+                # Process exited or isn't readable
+                continue
+            processes.append({'pid': int(entry.name), 'raw_cmdline': raw})
+    return processes
+
+def snapshot_processes():
+    """Collect every process's pid and cmdline in one pass.
+    
+    On Linux this reads /proc directly, giving raw_cmdline bytes. Elsewhere
+    it uses psutil, giving a cmdline list, and also
+    collects connections, since port lookups there go through psutil.
+    Cleanup passes the snapshot to each helper rather than having each walk
+    the process table.
+    """
+    if platform.system() == "Linux":
+        return _snapshot_processes_linux()
+    return [proc.info for proc in psutil.process_iter(['pid', 'cmdline', 'connections'])]
+
+def find_process_using_port(port, processes=None):
     """Find process using a specific port"""
     try:
-        # First try using psutil which is more comprehensive
-        for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+        # On Linux, read the socket tables directly rather than asking psutil
+        # for every process's connections
+        if platform.system() == "Linux":
+            try:
+                pids = _pids_by_port_linux(port, first_listener=True)
+            except OSError as e:
+                logger.warning(f"Could not read /proc socket tables: {str(e)}")
+            else:
+                # Listeners in another network namespace, or whose fds can't
+                # be read, are invisible to the scan; lsof may still see them
+                if not pids:
+                    pids = _lsof_pids(port)
+                return psutil.Process(pids[0]) if pids else None
+        
+        # Otherwise use psutil which is more comprehensive. A single system-wide
+        # connection table read comes first; it needs root on macOS, so fall
+        # back to asking each process on AccessDenied
+        try:
+            for conn in psutil.net_connections(kind='inet'):
+                if conn.laddr and conn.laddr.port == port and conn.pid:
+                    return psutil.Process(conn.pid)
+        except psutil.AccessDenied:
+            pass
+        
+        if processes is None:
+            processes = snapshot_processes()
+        for info in processes:
             try:
-                connections = proc.connections(kind='inet')
+                connections = info.get('connections')
+                if connections is None:
+                    connections = psutil.Process(info['pid']).connections(kind='inet')
                 for conn in connections:
                     if conn.laddr.port == port:
-                        return proc
+                        return psutil.Process(info['pid'])
             except (psutil.AccessDenied, psutil.NoSuchProcess):
                 pass
                 
         # If psutil didn't find it, try platform-specific commands
-        if platform.system() == "Linux":
-            cmd = f"lsof -i :{port} -t"
-            result = subprocess.run(cmd, shell=True, text=True, capture_output=True)
-            if result.stdout.strip():
-                pid = int(result.stdout.strip())
-                return psutil.Process(pid)
-                
-        elif platform.system() == "Darwin":  # macOS
-            cmd = f"lsof -i :{port} -t"
-            result = subprocess.run(cmd, shell=True, text=True, capture_output=True)
-            if result.stdout.strip():
-                # Could be multiple PIDs
-                pids = [int(pid) for pid in result.stdout.strip().split('\n') if pid.strip()]
-                if pids:
-                    return psutil.Process(pids[0])
+        if platform.system() in ["Linux", "Darwin"]:
+            # Could be multiple PIDs
+            pids = _lsof_pids(port)
+            if pids:
+                return psutil.Process(pids[0])
     except Exception as e:
         logger.error(f"Error finding process using port {port}: {str(e)}")
     
     return None
 
+# Seconds a port check result is reused; repeated polls within one cleanup
+# cycle share a probe
+PORT_CHECK_TTL = 0.5
+# port -> (monotonic time of the check, in use)
+_port_check_cache = {}
+_port_check_lock = threading.Lock()
+
+def invalidate_port_check(port):
+    """Forget a cached port check, e.g. after killing the port's owner"""
+    with _port_check_lock:
+        _port_check_cache.pop(port, None)
+
 def is_port_in_use(port):
-    """Check if a port is in use more thoroughly"""
-    # Try multiple methods to check if the port is in use
+    """Check if a port is in use, reusing a check from the last PORT_CHECK_TTL seconds"""
+    now = time.monotonic()
+    with _port_check_lock:
+        cached = _port_check_cache.get(port)
+    if cached and now - cached[0] < PORT_CHECK_TTL:
+        return cached[1]
     
-    # Method 1: Using socket
-    try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.settimeout(1)
-            result = s.connect_ex(('127.0.0.1', port))
-            if result == 0:
-                logger.info(f"Port {port} is in use (socket check)")
-                return True
-    except Exception as e:
-        logger.error(f"Socket check error: {str(e)}")
-    
-    # Method 2: Try to bind to the port (most reliable)
+    in_use = _is_port_in_use_uncached(port)
+    with _port_check_lock:
+        _port_check_cache[port] = (now, in_use)
+    return in_use
+
+def _is_port_in_use_uncached(port):
+    """Check if a port is in use by trying to bind it, as a server would"""
     try:
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
             s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             s.bind(('0.0.0.0', port))
-            logger.info(f"Port {port} is free (bind check)")
-            return False
-    except Exception:
+    except OSError:
         logger.info(f"Port {port} is in use (bind check)")
         return True
+    logger.info(f"Port {port} is free (bind check)")
+    return False
+
+# Backoff between bind attempts while waiting for a port to be released
+PORT_FREE_RETRY_DELAYS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0)
+
+def wait_for_port_free(port, delays=PORT_FREE_RETRY_DELAYS):
+    """Wait until the port can be bound, backing off between attempts.
     
-    # Method 3: Using platform-specific commands
+    Returns None once the port is free, or the OSError from the last bind
+    attempt if it never was.
+    """
+    for delay in (0,) + tuple(delays):
+        time.sleep(delay)
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                s.bind(('0.0.0.0', port))
+            return None
+        except OSError as e:
+            error = e
+    return error
+
+# Backoff while waiting for a port after killing its owner (6.35s at most)
+PORT_RELEASE_DELAYS = (0.05, 0.1, 0.2, 0.4, 0.8, 1.6, 3.2)
+# Backoff before the next cleanup attempt (1.55s at most)
+RETRY_BACKOFF_DELAYS = (0.05, 0.1, 0.2, 0.4, 0.8)
+# Backoff while waiting for a terminated process to exit (1.05s at most)
+PROCESS_EXIT_DELAYS = (0.05, 0.1, 0.2, 0.3, 0.4)
+
+def _process_exited(pid):
+    """Check whether a process is gone, reaping it if it's our child"""
     try:
-        if platform.system() == "Linux" or platform.system() == "Darwin":
-            result = subprocess.run(f"lsof -i :{port}", shell=True, capture_output=True)
-            if result.stdout:
-                logger.info(f"Port {port} is in use (lsof check)")
+        reaped, _ = os.waitpid(pid, os.WNOHANG)
+        return reaped != 0
+    except ChildProcessError:
+        # Not our child (or already reaped); fall back to probing it
+        pass
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    return False
+
+def wait_for_exit(pid, delays=PROCESS_EXIT_DELAYS):
+    """Wait for a process to exit, for at most sum(delays) seconds.
+    
+    Where pidfd_open is available (Linux 5.3+), the wait wakes as soon as
+    the process exits; otherwise it polls with the given backoff.
+    Returns True if it exited.
+    """
+    if hasattr(os, 'pidfd_open'):
+        try:
+            pidfd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            # Kernel without pidfd support; poll instead
+            pass
+        else:
+            try:
+                ready, _, _ = select.select([pidfd], [], [], sum(delays))
+            finally:
+                os.close(pidfd)
+            if ready:
+                # Reap it if it's our child
+                _process_exited(pid)
                 return True
-    except Exception as e:
-        logger.error(f"Command check error: {str(e)}")
+            return False
     
-    # If we get here and haven't returned True, the port is probably free
+    for delay in (0,) + tuple(delays):
+        time.sleep(delay)
+        if _process_exited(pid):
+            return True
     return False
 
 def reset_network_socket(port):
@@ -237,9 +580,9 @@ def reset_network_socket(port):
         logger.error(f"Error resetting network socket: {str(e)}")
         return False
 
-def kill_process_using_port(port):
+def kill_process_using_port(port, processes=None):
     """Find and kill process using a specific port"""
-    process = find_process_using_port(port)
+    process = find_process_using_port(port, processes)
     if process:
         try:
             logger.info(f"Found process {process.pid} ({process.name()}) using port {port}")
@@ -262,18 +605,36 @@ def kill_process_using_port(port):
     
     return False
 
-def force_kill_processes_by_command_pattern(pattern):
+def force_kill_processes_by_command_pattern(pattern, processes=None):
     """Kill all processes that match a command pattern"""
     killed = False
+    needle = pattern.encode()
+    # The pattern's first word can't span arguments, so a raw cmdline
+    # without it is rejected before anything is allocated
+    first_word = needle.split(b' ', 1)[0]
     try:
-        for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+        if processes is None:
+            processes = snapshot_processes()
+        for info in processes:
+            raw = info.get('raw_cmdline')
+            if raw is not None:
+                if first_word not in raw:
+                    continue
+                # Same as ' '.join(args), in one pass over the bytes
+                joined = raw.rstrip(b'\0').replace(b'\0', b' ')
+                if needle not in joined:
+                    continue
+                cmdline = joined.decode(errors='replace')
+            else:
+                # None when the cmdline couldn't be read
+                cmdline = ' '.join(info['cmdline'] or ())
+                if pattern not in cmdline:
+                    continue
+            logger.info(f"Found matching process: {info['pid']} {cmdline}")
             try:
-                cmdline = ' '.join(proc.cmdline())
-                if pattern in cmdline:
-                    logger.info(f"Found matching process: {proc.pid} {cmdline}")
-                    proc.kill()
-                    killed = True
-            except (psutil.AccessDenied, psutil.NoSuchProcess, psutil.ZombieProcess):
+                os.kill(info['pid'], signal.SIGKILL)
+                killed = True
+            except (ProcessLookupError, PermissionError):
                 pass
     except Exception as e:
         logger.error(f"Error in force_kill_processes_by_command_pattern: {str(e)}")
@@ -292,20 +653,18 @@ def stop_running_server(process_id=None, project_id=None):
             logger.info(f"Stopping running server for project {project_id}")
             os.killpg(os.getpgid(process_id), signal.SIGTERM)
             
-            # Wait a moment for process to terminate
-            time.sleep(1)
-            
-            # Check if process still exists and force kill if necessary
-            try:
-                os.kill(process_id, 0)  # This will raise an error if process doesn't exist
+            # Give the process up to about a second to terminate, and force
+            # kill it if it doesn't
+            if wait_for_exit(process_id):
+                logger.info(f"Process {process_id} terminated successfully")
+            else:
                 logger.info(f"Process {process_id} still exists, sending SIGKILL")
                 os.killpg(os.getpgid(process_id), signal.SIGKILL)
-            except OSError:
-                logger.info(f"Process {process_id} terminated successfully")
                 
         except Exception as e:
             logger.error(f"Error stopping server by process ID: {str(e)}")
             success = False
+        invalidate_port_check(PROXY_PORT)
     
     # Kill any processes using the proxy port (3035 by default)
     logger.info(f"Checking for processes using port {PROXY_PORT}")
@@ -315,42 +674,46 @@ def stop_running_server(process_id=None, project_id=None):
     while is_port_in_use(PROXY_PORT) and retries < max_retries:
         logger.info(f"Port {PROXY_PORT} is in use (attempt {retries+1}/{max_retries}), attempting cleanup")
         
+        # One process table walk shared by both kill strategies
+        processes = snapshot_processes()
+        
         # First try to kill by port
-        if kill_process_using_port(PROXY_PORT):
+        if kill_process_using_port(PROXY_PORT, processes):
             logger.info(f"Killed process using port {PROXY_PORT}")
+            invalidate_port_check(PROXY_PORT)
         
         # Also try to kill any Vite processes which might be binding to the port
-        if force_kill_processes_by_command_pattern("vite --port"):
+        if force_kill_processes_by_command_pattern("vite --port", processes):
             logger.info("Killed Vite processes")
+            invalidate_port_check(PROXY_PORT)
         
         # Try to reset the network socket
-        reset_network_socket(PROXY_PORT)
+        if reset_network_socket(PROXY_PORT):
+            invalidate_port_check(PROXY_PORT)
         
-        # Wait for the port to be released
-        for i in range(5):
-            if not is_port_in_use(PROXY_PORT):
-                logger.info(f"Port {PROXY_PORT} is now free (after {i+1} seconds)")
-                break
-            logger.info(f"Waiting for port {PROXY_PORT} to be released... ({i+1}/5 seconds)")
-            time.sleep(1)
+        # Wait for the port to be released, backing off from 50ms
+        logger.info(f"Waiting for port {PROXY_PORT} to be released...")
+        started = time.monotonic()
+        if wait_for_port_free(PROXY_PORT, PORT_RELEASE_DELAYS) is None:
+            logger.info(f"Port {PROXY_PORT} is now free (after {time.monotonic() - started:.2f} seconds)")
+        invalidate_port_check(PROXY_PORT)
             
         retries += 1
         
         if is_port_in_use(PROXY_PORT):
             logger.warning(f"Port {PROXY_PORT} still in use after cleanup attempt, trying more aggressive methods...")
             
-            # On Linux/Mac, try using lsof and kill
+            # On Linux/Mac, SIGKILL everything holding the port
             if platform.system() in ["Linux", "Darwin"]:
                 try:
-                    # Force kill with OS-specific commands
-                    cmd = f"lsof -i :{PROXY_PORT} -t | xargs kill -9"
-                    subprocess.run(cmd, shell=True, stderr=subprocess.PIPE)
-                    logger.info(f"Executed force kill command: {cmd}")
+                    if kill_all_pids_on_port(PROXY_PORT):
+                        invalidate_port_check(PROXY_PORT)
                 except Exception as e:
-                    logger.error(f"Error executing force kill command: {str(e)}")
+                    logger.error(f"Error force killing processes on port {PROXY_PORT}: {str(e)}")
             
-            # Wait before next retry
-            time.sleep(2)
+            # Wait before next retry, returning early once the port frees
+            wait_for_port_free(PROXY_PORT, RETRY_BACKOFF_DELAYS)
+            invalidate_port_check(PROXY_PORT)
     
     if is_port_in_use(PROXY_PORT):
         logger.error(f"CRITICAL: Port {PROXY_PORT} is still in use after {max_retries} attempts")
@@ -359,10 +722,6 @@ def stop_running_server(process_id=None, project_id=None):
     else:
         logger.info(f"Port {PROXY_PORT} is now free and available")
     
-    # Add a reasonable wait time to ensure port is released
-    logger.info("Waiting for 5 seconds to ensure resources are freed...")
-    time.sleep(1)
-    
     logger.info("====== SERVER CLEANUP COMPLETE ======")
     
     return success